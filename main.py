@@ -1,119 +1,262 @@
-from utils.file_handler import read_sales_data
-from utils.file_handler import parse_transactions
-from utils.file_handler import validate_and_filter
-
-from utils.data_processor import (
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    customer_analysis,
-    daily_sales_trend,
-    find_peak_sales_day,
-    low_performing_products
-)
-
-from utils.api_handler import (
-    fetch_all_products,
-    create_product_mapping,
-    enrich_sales_data,
-    save_enriched_data
-)
-
-from utils.report_generator import generate_sales_report
-
-
-def main():
+import sys
+
+# Pipeline modules are imported inside the step functions below. Scheduled
+# runs on small files spend most of their time in interpreter start-up and
+# imports, so each run only loads what it actually uses (offline runs never
+# import the HTTP stack). startup_benchmark.py checks the import budget.
+
+
+SALES_FILE = "data/sales_data.txt"
+
+
+def read_and_parse(filename=SALES_FILE, cache_dir=None):
     """
-    Main execution function
+    Steps 1-2: reads and parses the sales file
+
+    With a cache directory the parsed list is tagged with a content hash of
+    the file, so analytics results are reused across runs on unchanged data.
     """
 
-    try:
-        print("=" * 40)
-        print("SALES ANALYTICS SYSTEM")
-        print("=" * 40)
+    from utils.file_handler import read_transactions_parallel
+
+    # The file is memory-mapped and parsed straight from bytes, so large
+    # files are not decoded into a list of lines first
+    print("\n[1/10] Reading sales data...")
+    print("\n[2/10] Parsing and cleaning data...")
+    parsed_transactions = read_transactions_parallel(filename)
+    print(f"✓ Parsed {len(parsed_transactions)} records")
+
+    if cache_dir:
+        from utils.cache import TransactionList, configure_cache, file_fingerprint
+        from utils.file_handler import expand_sales_paths
+
+        configure_cache(disk_dir=cache_dir)
+        content_key = "|".join(
+            file_fingerprint(path) for path in expand_sales_paths(filename)
+        )
+        parsed_transactions = TransactionList(parsed_transactions, content_key=content_key)
 
-        # 1. Read sales data
-        print("\n[1/10] Reading sales data...")
-        raw_lines = read_sales_data("data/sales_data.txt")
-        print(f"✓ Successfully read {len(raw_lines)} transactions")
+    return parsed_transactions
 
-        # 2. Parse and clean
-        print("\n[2/10] Parsing and cleaning data...")
-        parsed_transactions = parse_transactions(raw_lines)
-        print(f"✓ Parsed {len(parsed_transactions)} records")
 
-        # 3. Display filter options
-        print("\n[3/10] Filter Options Available:")
-        regions = sorted(set(tx['Region'] for tx in parsed_transactions if tx.get('Region')))
-        print("Regions:", ", ".join(regions))
+def prompt_filters(parsed_transactions):
+    """
+    Step 3: shows filter options and asks the user for filters
+
+    Returns: tuple (region_filter, min_amount, max_amount)
+    """
+
+    print("\n[3/10] Filter Options Available:")
+    regions = sorted(set(tx['Region'] for tx in parsed_transactions if tx.get('Region')))
+    print("Regions:", ", ".join(regions))
 
-        amounts = [tx['Quantity'] * tx['UnitPrice'] for tx in parsed_transactions]
-        print(f"Amount Range: ₹{min(amounts):,.0f} - ₹{max(amounts):,.0f}")
+    amounts = [tx['Quantity'] * tx['UnitPrice'] for tx in parsed_transactions]
+    print(f"Amount Range: ₹{min(amounts):,.0f} - ₹{max(amounts):,.0f}")
 
+    try:
         apply_filter = input("\nDo you want to filter data? (y/n): ").strip().lower()
+    except EOFError:
+        # No terminal attached (e.g. started by a scheduler): no filters
+        apply_filter = 'n'
 
-        region_filter = None
-        min_amount = None
-        max_amount = None
+    region_filter = None
+    min_amount = None
+    max_amount = None
 
-        if apply_filter == 'y':
-            region_filter = input("Enter region (or press Enter to skip): ").strip() or None
+    if apply_filter == 'y':
+        region_filter = input("Enter region (or press Enter to skip): ").strip() or None
 
-            min_amt = input("Enter minimum amount (or press Enter to skip): ").strip()
-            max_amt = input("Enter maximum amount (or press Enter to skip): ").strip()
+        min_amt = input("Enter minimum amount (or press Enter to skip): ").strip()
+        max_amt = input("Enter maximum amount (or press Enter to skip): ").strip()
 
-            min_amount = float(min_amt) if min_amt else None
-            max_amount = float(max_amt) if max_amt else None
+        min_amount = float(min_amt) if min_amt else None
+        max_amount = float(max_amt) if max_amt else None
 
-        # 4. Validate and filter
-        print("\n[4/10] Validating transactions...")
-        valid_data, invalid_count, summary = validate_and_filter(
-            parsed_transactions,
-            region=region_filter,
-            min_amount=min_amount,
-            max_amount=max_amount
-        )
+    return region_filter, min_amount, max_amount
+
+
+def validate_and_analyze(parsed_transactions, region_filter, min_amount, max_amount,
+                         max_groups=None):
+    """
+    Steps 4-5: validates, filters and analyzes the transactions
+
+    With max_groups the customer and product rankings are left to the
+    report, which computes them with spill-to-disk aggregation.
+
+    Returns: list of valid transactions
+    """
+
+    from utils.file_handler import validate_and_filter
+    from utils.data_processor import (
+        calculate_total_revenue,
+        region_wise_sales,
+        top_selling_products,
+        customer_analysis,
+        daily_sales_trend,
+        find_peak_sales_day,
+        low_performing_products
+    )
+
+    # 4. Validate and filter
+    print("\n[4/10] Validating transactions...")
+    valid_data, invalid_count, summary = validate_and_filter(
+        parsed_transactions,
+        region=region_filter,
+        min_amount=min_amount,
+        max_amount=max_amount
+    )
 
-        print(f"✓ Valid: {len(valid_data)} | Invalid: {invalid_count}")
+    print(f"✓ Valid: {len(valid_data)} | Invalid: {invalid_count}")
 
-        # 5. Analysis
-        print("\n[5/10] Analyzing sales data...")
-        calculate_total_revenue(valid_data)
-        region_wise_sales(valid_data)
+    # 5. Analysis
+    print("\n[5/10] Analyzing sales data...")
+    calculate_total_revenue(valid_data)
+    region_wise_sales(valid_data)
+    if max_groups is None:
         top_selling_products(valid_data)
         customer_analysis(valid_data)
-        daily_sales_trend(valid_data)
-        find_peak_sales_day(valid_data)
-        low_performing_products(valid_data)
-        print("✓ Analysis complete")
+    daily_sales_trend(valid_data)
+    find_peak_sales_day(valid_data)
+    low_performing_products(valid_data)
+    print("✓ Analysis complete")
+
+    return valid_data
 
-        # 6. Fetch API products
-        print("\n[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
-        print(f"✓ Fetched {len(api_products)} products")
 
-        # 7. Enrich sales data
-        print("\n[7/10] Enriching sales data...")
-        product_mapping = create_product_mapping(api_products)
-        enriched_data = enrich_sales_data(valid_data, product_mapping)
+def enrich_and_report(valid_data, api_products, max_groups=None, save_enriched=True):
+    """
+    Steps 7-10: enriches, saves and reports on the valid transactions
+
+    With save_enriched=False the enriched data file is left as it is
+    """
 
-        enriched_count = sum(1 for tx in enriched_data if tx.get("API_Match"))
-        success_rate = (enriched_count / len(enriched_data)) * 100 if enriched_data else 0
-        print(f"✓ Enriched {enriched_count}/{len(enriched_data)} transactions ({success_rate:.1f}%)")
+    from utils.api_handler import (
+        create_product_mapping,
+        enrich_sales_data,
+        save_enriched_data
+    )
+    from utils.report_generator import generate_sales_report
 
-        # 8. Save enriched data
+    # 7. Enrich sales data
+    print("\n[7/10] Enriching sales data...")
+    product_mapping = create_product_mapping(api_products)
+    enriched_data = enrich_sales_data(valid_data, product_mapping)
+
+    enriched_count = sum(1 for tx in enriched_data if tx.get("API_Match"))
+    success_rate = (enriched_count / len(enriched_data)) * 100 if enriched_data else 0
+    print(f"✓ Enriched {enriched_count}/{len(enriched_data)} transactions ({success_rate:.1f}%)")
+
+    from utils.product_client import format_client_metrics
+    print("  API client:", format_client_metrics())
+
+    # 8. Save enriched data
+    if save_enriched:
         print("\n[8/10] Saving enriched data...")
         save_enriched_data(enriched_data)
         print("✓ Saved to: data/enriched_sales_data.txt")
+    else:
+        print("\n[8/10] No product data: keeping the existing enriched data file")
+
+    # 9. Generate report
+    print("\n[9/10] Generating report...")
+    generate_sales_report(valid_data, enriched_data, max_groups=max_groups)
+    print("✓ Report saved to: output/sales_report.txt")
 
-        # 9. Generate report
-        print("\n[9/10] Generating report...")
-        generate_sales_report(valid_data, enriched_data)
-        print("✓ Report saved to: output/sales_report.txt")
+    # 10. Done
+    print("\n[10/10] Process Complete!")
+    print("=" * 40)
 
-        # 10. Done
-        print("\n[10/10] Process Complete!")
+
+def main(offline=False, cache_dir=None, sales_file=SALES_FILE, max_groups=None):
+    """
+    Main execution function
+
+    Parameters:
+        offline (bool): Skip the product API and enrich from the saved
+                        product catalog (if there is none, the enriched
+                        data file is not rewritten)
+        cache_dir (str): Optional directory for cached analytics results
+        sales_file (str): Sales file (plain or .gz/.bz2/.xz/.zst), directory
+                          or glob pattern to read
+        max_groups (int): Optional limit on the customers/products held in
+                          memory for the rankings (spills to disk beyond it)
+    """
+
+    try:
         print("=" * 40)
+        print("SALES ANALYTICS SYSTEM")
+        print("=" * 40)
+
+        parsed_transactions = read_and_parse(sales_file, cache_dir)
+        region_filter, min_amount, max_amount = prompt_filters(parsed_transactions)
+        valid_data = validate_and_analyze(
+            parsed_transactions, region_filter, min_amount, max_amount, max_groups
+        )
+
+        # 6. Fetch API products
+        if offline:
+            from utils.product_client import load_fallback_catalog
+
+            api_products = load_fallback_catalog()
+            if api_products:
+                print("\n[6/10] Offline mode: using saved product catalog "
+                      f"({len(api_products)} products)")
+            else:
+                print("\n[6/10] Offline mode: no saved product catalog, skipping enrichment")
+        else:
+            from utils.api_handler import fetch_all_products
+
+            print("\n[6/10] Fetching product data from API...")
+            api_products = fetch_all_products()
+            print(f"✓ Fetched {len(api_products)} products")
+
+        enrich_and_report(valid_data, api_products, max_groups,
+                          save_enriched=bool(api_products) or not offline)
+
+    except Exception as e:
+        print("\n❌ An error occurred:")
+        print(str(e))
+        print("Please check inputs or files and try again.")
+
+
+async def main_async(cache_dir=None, sales_file=SALES_FILE, max_groups=None):
+    """
+    Pipelined execution: the product catalog is fetched while the sales
+    file is read, filtered and analyzed
+
+    Enrichment is the only step that waits for the catalog, so the API
+    latency is hidden behind ingest instead of being added after it.
+    """
+
+    import asyncio
+    from utils.api_handler import fetch_all_products
+
+    loop = asyncio.get_running_loop()
+
+    print("=" * 40)
+    print("SALES ANALYTICS SYSTEM")
+    print("=" * 40)
+
+    # 6. Fetch API products (started first, runs in a worker thread)
+    print("\n[6/10] Fetching product data from API (in background)...")
+    catalog_future = loop.run_in_executor(None, fetch_all_products)
+
+    try:
+        # Blocking steps run in the executor so the loop stays responsive
+        parsed_transactions = await loop.run_in_executor(
+            None, read_and_parse, sales_file, cache_dir
+        )
+        region_filter, min_amount, max_amount = prompt_filters(parsed_transactions)
+        valid_data = await loop.run_in_executor(
+            None, validate_and_analyze,
+            parsed_transactions, region_filter, min_amount, max_amount, max_groups
+        )
+
+        # Only enrichment needs the catalog
+        api_products = await catalog_future
+        print(f"\n✓ Fetched {len(api_products)} products")
+
+        enrich_and_report(valid_data, api_products, max_groups)
 
     except Exception as e:
         print("\n❌ An error occurred:")
@@ -122,4 +265,33 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # Plain flag checks instead of argparse keep start-up cheap
+    args = sys.argv[1:]
+
+    cache_dir = None
+    port = 8000
+    sales_file = SALES_FILE
+    max_groups = None
+    for arg in args:
+        if arg.startswith("--input="):
+            sales_file = arg.split("=", 1)[1]
+        elif arg.startswith("--cache-dir="):
+            cache_dir = arg.split("=", 1)[1]
+        elif arg.startswith("--port="):
+            port = int(arg.split("=", 1)[1])
+        elif arg.startswith("--max-groups="):
+            max_groups = int(arg.split("=", 1)[1])
+
+    if "--serve" in args:
+        from utils.query_server import serve_analytics
+        serve_analytics(sales_file, port=port)
+    elif "--watch" in args:
+        from utils.watcher import watch_sales_feed
+        watch_sales_feed(offline="--offline" in args)
+    elif "--offline" in args:
+        main(offline=True, cache_dir=cache_dir, sales_file=sales_file, max_groups=max_groups)
+    elif "--async" in args:
+        import asyncio
+        asyncio.run(main_async(cache_dir=cache_dir, sales_file=sales_file, max_groups=max_groups))
+    else:
+        main(cache_dir=cache_dir, sales_file=sales_file, max_groups=max_groups)
@@ -0,0 +1,100 @@
+"""
+Startup benchmark for the command line entry point.
+
+Measures the import cost of an offline run (main.py plus every pipeline
+module it loads) on top of a bare interpreter, and fails if that cost is
+over budget or if the HTTP stack gets imported.
+
+Usage:
+    python startup_benchmark.py [--budget-ms 25] [--runs 7]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+# Imports everything `python main.py --offline` loads, then reports
+# whether the HTTP client was pulled in along the way
+OFFLINE_IMPORTS = """
+import sys
+import main
+import utils.file_handler
+import utils.data_processor
+import utils.api_handler
+import utils.product_client
+import utils.report_generator
+print('requests' in sys.modules)
+"""
+
+
+def measure_import_time(code):
+    """
+    Runs `code` in a fresh interpreter with -X importtime
+
+    Returns: tuple (total self import time in ms, stdout text)
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    total_us = 0
+
+    # Lines look like: "import time:       300 |      48417 | utils.file_handler"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_time = line.split(":", 1)[1].split("|")[0].strip()
+        if self_time.isdigit():
+            total_us += int(self_time)
+
+    return total_us / 1000, result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=25.0,
+                        help="maximum import overhead over a bare interpreter")
+    parser.add_argument("--runs", type=int, default=7,
+                        help="number of measurements (the median is used)")
+    args = parser.parse_args()
+
+    baseline_runs = []
+    offline_runs = []
+    requests_loaded = False
+
+    for _ in range(args.runs):
+        baseline_ms, _ = measure_import_time("pass")
+        offline_ms, output = measure_import_time(OFFLINE_IMPORTS)
+
+        baseline_runs.append(baseline_ms)
+        offline_runs.append(offline_ms)
+        requests_loaded = requests_loaded or output == "True"
+
+    overhead_ms = statistics.median(offline_runs) - statistics.median(baseline_runs)
+
+    print(f"Interpreter baseline:  {statistics.median(baseline_runs):.1f} ms")
+    print(f"Offline run imports:   {statistics.median(offline_runs):.1f} ms")
+    print(f"Import overhead:       {overhead_ms:.1f} ms (budget {args.budget_ms:.1f} ms)")
+    print(f"HTTP stack imported:   {requests_loaded}")
+
+    if requests_loaded:
+        print("FAIL: offline run imported 'requests'")
+        return 1
+
+    if overhead_ms > args.budget_ms:
+        print("FAIL: import overhead is over budget")
+        return 1
+
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Shared fixtures for the correctness harness.
+
+Golden outputs live in tests/golden. Results on the sample file are stored
+as readable JSON; results on the generated large file are stored as SHA-256
+digests of the same canonical JSON. After an intended output change,
+regenerate them with:
+
+    python -m pytest --update-golden
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from utils import cache, product_client
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+SAMPLE_FILE = os.path.join(ROOT, 'data', 'sales_data.txt')
+
+LARGE_ROWS = 20000
+LARGE_SEED = 20240101
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--update-golden", action="store_true",
+                     help="rewrite the golden files from the current outputs")
+
+
+# ---------------- CANONICAL FORM ----------------
+
+def canonical(value):
+    """
+    Converts a result to plain JSON data with a stable order
+
+    Tuples become lists, records become dicts and sets become sorted lists.
+    'products_bought' comes from a set, so it is sorted as well. Dict order
+    is kept: it is part of the output of the ranking functions.
+    """
+
+    if isinstance(value, (set, frozenset)):
+        return sorted(canonical(item) for item in value)
+    if hasattr(value, 'items'):
+        return {
+            str(key): sorted(item) if key == 'products_bought' else canonical(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    return value
+
+
+def canonical_json(value):
+    return json.dumps(canonical(value), ensure_ascii=False)
+
+
+def mask_report(text):
+    """
+    Removes the only run-dependent line of the report
+    """
+    return re.sub(r"Generated: .*", "Generated: <masked>", text)
+
+
+@pytest.fixture
+def golden(request):
+    """
+    Compares a result with its golden file
+
+    Usage: golden('name', value) for readable JSON, golden('name', value,
+    digest=True) for large results, golden('name.txt', text) for text.
+    """
+
+    update = request.config.getoption("--update-golden")
+
+    def check(name, value, digest=False):
+        if name.endswith('.txt'):
+            path, expected_text = os.path.join(GOLDEN_DIR, name), value
+        elif digest:
+            path = os.path.join(GOLDEN_DIR, name + '.sha256')
+            expected_text = hashlib.sha256(canonical_json(value).encode('utf-8')).hexdigest() + "\n"
+        else:
+            path = os.path.join(GOLDEN_DIR, name + '.json')
+            expected_text = json.dumps(canonical(value), ensure_ascii=False, indent=2) + "\n"
+
+        if update:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(expected_text)
+            return
+
+        assert os.path.exists(path), f"missing golden file {path} (run with --update-golden)"
+        with open(path, encoding='utf-8') as file:
+            stored = file.read()
+
+        # Compared as text, so the order of rankings is pinned as well
+        assert expected_text == stored, f"output differs from {path}"
+
+    return check
+
+
+# ---------------- STATE ISOLATION ----------------
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch):
+    """
+    Starts every test with an empty analytics cache and a fresh API client
+    """
+
+    cache.clear_cache()
+    monkeypatch.setitem(cache._settings, 'disk_dir', None)
+    product_client.reset_client()
+
+    yield
+
+    cache.clear_cache()
+    product_client.reset_client()
+
+
+# ---------------- DATA ----------------
+
+def generate_sales_file(path, rows=LARGE_ROWS, seed=LARGE_SEED):
+    """
+    Writes a deterministic sales file shaped like data/sales_data.txt
+
+    About 5% of the rows are invalid in the ways the sample file is
+    (missing fields, bad IDs, zero quantity, negative price), and some
+    prices use thousands separators or decimals.
+    """
+
+    rng = random.Random(seed)
+
+    products = [(f"P{100 + i}", f"Product {i:03d}") for i in range(1, 121)]
+    regions = ["North", "South", "East", "West"]
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(HEADER)
+
+        for i in range(rows):
+            product_id, product_name = products[rng.randrange(len(products))]
+            customer_id = f"C{rng.randrange(1, 1501):04d}"
+            date = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            quantity = rng.randint(1, 10)
+            paise = rng.randrange(100, 5_000_000)
+            region = regions[rng.randrange(len(regions))]
+
+            if paise % 3 == 0:
+                price = f"{paise // 100:,}"
+            elif paise % 3 == 1:
+                price = f"{paise // 100}.{paise % 100:02d}"
+            else:
+                price = str(paise // 100)
+
+            defect = rng.random()
+            if defect < 0.01:
+                region = ""
+            elif defect < 0.02:
+                quantity = 0
+            elif defect < 0.03:
+                price = "-" + price
+            elif defect < 0.04:
+                customer_id = "X" + customer_id[1:]
+            elif defect < 0.05:
+                product_name = product_name.replace(" ", ",")
+
+            file.write(f"T{i:06d}|{date}|{product_id}|{product_name}|{quantity}|"
+                       f"{price}|{customer_id}|{region}\n")
+
+
+def load_valid(filename):
+    parsed = parse_transactions(read_sales_data(filename))
+    valid, _, _ = validate_and_filter(parsed, verbose=False)
+    return valid
+
+
+@pytest.fixture(scope='session')
+def sample_file():
+    return SAMPLE_FILE
+
+
+@pytest.fixture(scope='session')
+def large_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('large') / 'sales_data.txt')
+    generate_sales_file(path)
+    return path
+
+
+@pytest.fixture(params=['sample', 'large'])
+def dataset(request, sample_file, large_file):
+    """
+    (name, filename) of the sample file and of the generated large file
+    """
+    if request.param == 'sample':
+        return 'sample', sample_file
+    return 'large', large_file
+
+
+# ---------------- FAKE DUMMYJSON ----------------
+
+FAKE_PRODUCT_COUNT = 194
+FAKE_CATEGORIES = ["beauty", "fragrances", "furniture", "groceries", "laptops", "smartphones"]
+
+
+def fake_products():
+    return [
+        {
+            'id': i,
+            'title': f"Fake Product {i}",
+            'category': FAKE_CATEGORIES[i % len(FAKE_CATEGORIES)],
+            'brand': f"Brand {i % 7}",
+            'rating': round(3 + (i * 37 % 200) / 100, 2)
+        }
+        for i in range(1, FAKE_PRODUCT_COUNT + 1)
+    ]
+
+
+class _FakeDummyJSONHandler(BaseHTTPRequestHandler):
+    """
+    /products?limit=N like DummyJSON; /error answers 500; /slow stalls
+    """
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.hits.append(url.path)
+
+        if url.path == '/error':
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        if url.path == '/slow':
+            self.server.release.wait(5)
+
+        limit = int(parse_qs(url.query).get('limit', ['30'])[0])
+        products = fake_products()[:limit]
+        body = json.dumps({'products': products, 'total': FAKE_PRODUCT_COUNT,
+                           'skip': 0, 'limit': len(products)}).encode('utf-8')
+
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # The client timed out and closed the connection
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_dummyjson(monkeypatch, tmp_path):
+    """
+    Serves a fake DummyJSON API on localhost and points the client at it
+
+    The fallback catalog is written to a temporary directory.
+    """
+
+    pytest.importorskip("requests")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeDummyJSONHandler)
+    server.hits = []
+    server.release = threading.Event()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(product_client, 'PRODUCTS_URL', server.base_url + "/products?limit=100")
+    monkeypatch.setattr(product_client, 'BACKOFF_BASE', 0.01)
+    monkeypatch.chdir(tmp_path)
+
+    yield server
+
+    server.release.set()
+    server.shutdown()
+    server.server_close()
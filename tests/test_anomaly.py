@@ -0,0 +1,131 @@
+import statistics
+
+import pytest
+
+from utils.anomaly import (
+    MIN_HISTORY,
+    new_detector,
+    observe_transaction,
+    close_days,
+    detect_anomalies,
+    find_sales_anomalies
+)
+from utils.transaction import Transaction
+
+from conftest import canonical, load_valid
+
+
+def _row(day, amount, region='North', product='Widget'):
+    return Transaction(f"T{day}{region}{product}", f"2024-03-{day:02d}", "P101", product,
+                       1, amount, "C001", region)
+
+
+def _series(amounts, **kwargs):
+    return [_row(day, amount, **kwargs) for day, amount in enumerate(amounts, start=1) if amount]
+
+
+def test_welford_state_matches_statistics():
+    amounts = [120, 95, 130, 110, 105, 99, 140, 87]
+    detector = new_detector()
+    for tx in _series(amounts):
+        observe_transaction(detector, tx)
+    close_days(detector)
+
+    days, active_days, mean, m2, _ = detector['series'][('Region', 'North')]
+    paise = [amount * 100 for amount in amounts]
+
+    assert (days, active_days) == (len(amounts), len(amounts))
+    assert mean == pytest.approx(statistics.mean(paise))
+    assert m2 / (days - 1) == pytest.approx(statistics.variance(paise))
+
+
+def test_spike_and_drop():
+    steady = [100, 104, 98, 101, 99, 103, 97, 100, 102, 98]
+    rows = (_series(steady + [400] + steady + [100], region='North')
+            + _series(steady + [100] + steady + [30], region='South'))
+
+    anomalies = [(a['date'], a['name'], a['type']) for a in find_sales_anomalies(rows)]
+
+    assert ('2024-03-11', 'North', 'spike') in anomalies
+    assert ('2024-03-22', 'South', 'drop') in anomalies
+    assert all(date in ('2024-03-11', '2024-03-22') for date, _, _ in anomalies)
+
+
+@pytest.mark.parametrize('amount, kind', [(100_000, 'spike'), (1, 'drop'), (104, None)])
+def test_flat_history(amount, kind):
+    # Zero variance: only a large departure from the flat level is flagged
+    anomalies = find_sales_anomalies(_series([100] * 10 + [amount]))
+
+    assert [(a['date'], a['type']) for a in anomalies if a['dimension'] == 'Region'] == \
+        ([('2024-03-11', kind)] if kind else [])
+
+
+def test_short_history_is_not_flagged():
+    rows = _series([100] * (MIN_HISTORY - 1) + [1000])
+    assert find_sales_anomalies(rows) == []
+
+
+def test_sparse_series_is_not_flagged():
+    # A product that sells every fifth day: each sale is not an outlier
+    amounts = [500 if day % 5 == 0 else 0 for day in range(1, 29)]
+    rows = _series([100] * 28, product='Steady') + _series(amounts, region='South', product='Rare')
+
+    assert [a for a in find_sales_anomalies(rows) if a['name'] == 'Rare'] == []
+
+
+def test_streaming_matches_batch(large_file):
+    valid = load_valid(large_file)
+    expected = find_sales_anomalies(valid)
+
+    # Rows arrive in date order; each day is closed once the next one starts
+    detector = new_detector()
+    alerts = []
+    for tx in sorted(valid, key=lambda tx: tx['Date']):
+        if detector['open_days'] and tx['Date'] not in detector['open_days']:
+            alerts.extend(close_days(detector, tx['Date']))
+        observe_transaction(detector, tx)
+
+    assert len(detector['open_days']) == 1
+    assert canonical(detect_anomalies(detector)) == canonical(expected)
+
+    alerts.extend(close_days(detector))
+    assert canonical(alerts) == canonical(expected)
+    assert detector['late_rows'] == 0
+
+
+def test_detect_anomalies_does_not_close_days(sample_file):
+    detector = new_detector()
+    for tx in load_valid(sample_file):
+        observe_transaction(detector, tx)
+
+    open_days = len(detector['open_days'])
+    first = detect_anomalies(detector)
+
+    assert len(detector['open_days']) == open_days
+    assert detector['series'] == {}
+    assert detect_anomalies(detector) == first
+
+
+def test_late_rows_are_counted():
+    detector = new_detector()
+    for tx in _series([100, 100, 100]):
+        observe_transaction(detector, tx)
+    close_days(detector, '2024-03-03')
+
+    observe_transaction(detector, _row(1, 50))
+
+    assert detector['late_rows'] == 1
+    assert list(detector['open_days']) == ['2024-03-03']
+
+
+def test_date_ordered_input_matches_unordered(large_file):
+    valid = load_valid(large_file)
+    by_date = sorted(valid, key=lambda tx: tx['Date'])
+
+    expected = find_sales_anomalies.uncached(valid)
+
+    assert canonical(find_sales_anomalies.uncached(by_date)) == canonical(expected)
+    assert canonical(find_sales_anomalies(iter(by_date))) == canonical(expected)
+
+    with pytest.raises(ValueError):
+        find_sales_anomalies(iter(valid))
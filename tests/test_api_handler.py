@@ -0,0 +1,118 @@
+import os
+
+from utils import product_client
+from utils.api_handler import (
+    fetch_all_products,
+    create_product_mapping,
+    enrich_sales_data,
+    save_enriched_data
+)
+
+from conftest import fake_products, load_valid
+
+
+def test_fetch_all_products(fake_dummyjson):
+    products = fetch_all_products()
+
+    assert products == fake_products()[:100]
+    assert fake_dummyjson.hits == ['/products']
+    # The catalog is kept for later fallback
+    assert product_client.load_fallback_catalog() == products
+
+
+def test_fetch_all_products_falls_back_to_saved_catalog(fake_dummyjson, monkeypatch):
+    saved = fetch_all_products()
+
+    product_client.reset_client()
+    monkeypatch.setattr(product_client, 'PRODUCTS_URL', fake_dummyjson.base_url + "/error")
+
+    assert fetch_all_products() == saved
+    assert product_client.get_client_metrics()['last_source'] == 'fallback'
+    # Bounded retries against the failing endpoint
+    assert fake_dummyjson.hits.count('/error') == product_client.MAX_ATTEMPTS
+
+
+def test_fetch_all_products_without_api_or_catalog(fake_dummyjson, monkeypatch):
+    monkeypatch.setattr(product_client, 'PRODUCTS_URL', fake_dummyjson.base_url + "/error")
+
+    assert fetch_all_products() == []
+    assert product_client.get_client_metrics()['last_source'] == 'none'
+
+
+def test_read_timeout(fake_dummyjson):
+    products, source = product_client.fetch_products(
+        fake_dummyjson.base_url + "/slow", timeout=(1, 0.2), max_attempts=1, fallback_file=None
+    )
+
+    assert (products, source) == ([], 'none')
+    assert product_client.get_client_metrics()['api_failures'] == 1
+
+
+def test_circuit_breaker_stops_calls(fake_dummyjson, monkeypatch):
+    monkeypatch.setattr(product_client, 'PRODUCTS_URL', fake_dummyjson.base_url + "/error")
+
+    for _ in range(product_client.FAILURE_THRESHOLD):
+        fetch_all_products()
+    calls = len(fake_dummyjson.hits)
+
+    assert product_client.get_client_metrics()['breaker_state'] == 'open'
+    assert fetch_all_products() == []
+    assert len(fake_dummyjson.hits) == calls
+
+    # After the cool-down a single trial request closes the breaker again
+    monkeypatch.setattr(product_client, 'RESET_TIMEOUT', 0)
+    monkeypatch.setattr(product_client, 'PRODUCTS_URL', fake_dummyjson.base_url + "/products?limit=5")
+
+    assert len(fetch_all_products()) == 5
+    assert product_client.get_client_metrics()['breaker_state'] == 'closed'
+
+
+def test_create_product_mapping(golden):
+    golden('product_mapping', create_product_mapping(fake_products()))
+
+
+def test_enrich_sales_data(golden, sample_file):
+    valid = load_valid(sample_file)
+
+    # DummyJSON's first 100 products do not cover the sample ProductIDs
+    # (P101-P110); the full catalog does
+    golden('sample_enriched_first_100', enrich_sales_data(valid, create_product_mapping(fake_products()[:100])))
+    golden('sample_enriched_full_catalog', enrich_sales_data(valid, create_product_mapping(fake_products())))
+
+
+def test_save_enriched_data(golden, sample_file, tmp_path):
+    valid = load_valid(sample_file)
+    enriched = enrich_sales_data(valid, create_product_mapping(fake_products()))
+
+    filename = str(tmp_path / 'data' / 'enriched_sales_data.txt')
+    save_enriched_data(enriched, filename)
+
+    assert os.path.exists(filename)
+    with open(filename, encoding='utf-8') as file:
+        golden('sample_enriched_sales_data.txt', file.read())
+
+
+def test_offline_run_enriches_from_saved_catalog(fake_dummyjson, monkeypatch, sample_file):
+    import main
+
+    monkeypatch.setattr('builtins.input', lambda prompt='': 'n')
+    enriched_file = os.path.join('data', 'enriched_sales_data.txt')
+
+    # No saved catalog: the existing enriched data file is left alone
+    os.makedirs('data', exist_ok=True)
+    with open(enriched_file, 'w', encoding='utf-8') as file:
+        file.write('previous run\n')
+    main.main(offline=True, sales_file=sample_file)
+    with open(enriched_file, encoding='utf-8') as file:
+        assert file.read() == 'previous run\n'
+
+    fetch_all_products()
+    main.main(offline=True, sales_file=sample_file)
+
+    valid = load_valid(sample_file)
+    expected = os.path.join('expected', 'enriched_sales_data.txt')
+    save_enriched_data(enrich_sales_data(valid, create_product_mapping(fake_products()[:100])),
+                       expected)
+    with open(enriched_file, encoding='utf-8') as file, open(expected, encoding='utf-8') as other:
+        assert file.read() == other.read()
+    assert fake_dummyjson.hits == ['/products']
@@ -0,0 +1,78 @@
+import gc
+
+from utils import cache
+from utils.cache import TransactionList, file_fingerprint
+from utils.data_processor import calculate_total_revenue, region_wise_sales
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+
+from conftest import load_valid
+
+
+def test_plain_lists_are_not_cached(sample_file):
+    rows = list(load_valid(sample_file))
+    before = calculate_total_revenue(rows)
+
+    rows[0] = rows[1]
+
+    assert calculate_total_revenue(rows) == calculate_total_revenue.uncached(rows)
+    assert calculate_total_revenue(rows) != before
+    assert cache.cache_stats()['size'] == 0
+
+
+def test_generators_are_not_cached(sample_file):
+    valid = load_valid(sample_file)
+    assert calculate_total_revenue(tx for tx in valid) == calculate_total_revenue(valid)
+
+
+def test_in_place_changes_invalidate(sample_file):
+    rows = load_valid(sample_file)
+    before = calculate_total_revenue(rows)
+
+    rows[0] = rows[1]
+
+    assert calculate_total_revenue(rows) != before
+    assert calculate_total_revenue(rows) == calculate_total_revenue.uncached(rows)
+
+
+def test_entries_do_not_keep_datasets_alive(sample_file):
+    rows = load_valid(sample_file)
+    region_wise_sales(rows)
+    assert cache.cache_stats()['size'] == 1
+
+    del rows
+    gc.collect()
+
+    assert cache.cache_stats()['size'] == 0
+
+
+def test_disk_tier_is_versioned(monkeypatch, sample_file, tmp_path):
+    def load():
+        parsed = TransactionList(parse_transactions(read_sales_data(sample_file)),
+                                 content_key=file_fingerprint(sample_file))
+        valid, _, _ = validate_and_filter(parsed, verbose=False)
+        return valid
+
+    cache.configure_cache(disk_dir=str(tmp_path / 'cache'))
+    region_wise_sales(load())
+
+    cache.clear_cache()
+    region_wise_sales(load())
+    assert cache.cache_stats()['disk_hits'] == 1
+
+    # Results written by another version of the analytics are not reused
+    monkeypatch.setattr(cache, 'CACHE_VERSION', cache.CACHE_VERSION + 1)
+    cache.clear_cache()
+    region_wise_sales(load())
+    assert cache.cache_stats()['disk_hits'] == 0
+
+
+def test_validated_rows_sort_with_keyword_arguments(sample_file):
+    rows = load_valid(sample_file)
+    assert isinstance(rows, TransactionList)
+    version = rows.version
+
+    rows.sort(key=lambda tx: tx['Date'], reverse=True)
+
+    assert [tx['Date'] for tx in rows] == sorted((tx['Date'] for tx in rows), reverse=True)
+    assert rows.version == version + 1
+    assert calculate_total_revenue(rows) == calculate_total_revenue.uncached(rows)
@@ -0,0 +1,96 @@
+import random
+
+from utils.customer_behavior import _score, analyze_customer_behavior, sort_by_customer_date
+from utils.transaction import Transaction
+
+from conftest import canonical, load_valid
+
+
+def _tx(customer, date, amount):
+    return Transaction(f"T{customer}{date}{amount}", date, "P1", "Widget", 1, amount,
+                       customer, "North")
+
+
+ROWS = [
+    _tx('C1', '2024-01-05', 100), _tx('C1', '2024-01-15', 50),
+    _tx('C1', '2024-03-01', 200), _tx('C1', '2024-03-01', 10),
+    _tx('C2', '2024-01-20', 30), _tx('C2', '2024-01-27', 30),
+    _tx('C3', '2024-02-10', 80), _tx('C3', '2024-02-22', 20),
+    _tx('C4', '2024-03-05', 40),
+    # Dates that are not 'YYYY-MM-DD' are skipped and counted
+    _tx('C4', '2024/03/06', 999), _tx('C4', '20240306', 999)
+]
+
+
+def test_cohorts_and_retention():
+    result = analyze_customer_behavior(ROWS)
+
+    assert result['cohorts'] == {'2024-01': 2, '2024-02': 1, '2024-03': 1}
+    assert result['retention'] == {
+        '2024-01': {0: 100.0, 1: 0.0, 2: 50.0},
+        '2024-02': {0: 100.0, 1: 0.0},
+        '2024-03': {0: 100.0}
+    }
+    assert result['invalid_dates'] == 2
+
+
+def test_repeat_purchase_intervals():
+    # Gaps: C1 10 and 46 days (2024 is a leap year), C2 7, C3 12
+    repeat = analyze_customer_behavior(ROWS)['repeat_purchases']
+
+    assert repeat == {
+        'customers': 4,
+        'repeat_customers': 3,
+        'repeat_rate': 75.0,
+        'interval_count': 4,
+        'avg_interval_days': 18.75,
+        'median_interval_days': 11.0,
+        'interval_histogram': {7: 1, 10: 1, 12: 1, 46: 1}
+    }
+
+    # Odd number of intervals: the middle one
+    odd = analyze_customer_behavior(ROWS[:6])['repeat_purchases']
+    assert odd['median_interval_days'] == 10
+
+
+def test_rfm_scores():
+    rfm = analyze_customer_behavior(ROWS)['rfm']
+
+    assert {customer: (stats['recency_days'], stats['frequency'], stats['monetary'])
+            for customer, stats in rfm.items()} == {
+        'C1': (4, 4, 360.0), 'C2': (38, 2, 60.0), 'C3': (12, 2, 100.0), 'C4': (0, 1, 40.0)
+    }
+
+    # C2 and C3 tie on frequency and share its score
+    assert {customer: stats['rfm_score'] for customer, stats in rfm.items()} == \
+        {'C1': '344', 'C2': '122', 'C3': '223', 'C4': '411'}
+
+    assert rfm['C1']['avg_interval_days'] == 28.0
+    assert rfm['C4']['avg_interval_days'] is None
+
+    as_of = analyze_customer_behavior(ROWS, as_of='2024-03-10')['rfm']
+    assert as_of['C4']['recency_days'] == 5
+
+
+def test_score_ties():
+    assert _score([10, 20, 20, 30], 4) == [1, 2, 2, 4]
+    assert _score([10, 20, 20, 30], 4, higher_is_better=False) == [4, 2, 2, 1]
+    assert _score([7, 7, 7], 5) == [1, 1, 1]
+    assert _score([3, 1, 2, 5, 4], 5) == [3, 1, 2, 5, 4]
+
+
+def test_presorted_matches_and_order_does_not_matter(large_file):
+    valid = load_valid(large_file)
+    expected = analyze_customer_behavior(valid)
+
+    shuffled = list(valid)
+    random.Random(3).shuffle(shuffled)
+
+    assert canonical(analyze_customer_behavior(shuffled)) == canonical(expected)
+    assert canonical(analyze_customer_behavior(iter(sort_by_customer_date(valid)),
+                                               presorted=True)) == canonical(expected)
+
+
+def test_empty_input():
+    result = analyze_customer_behavior([])
+    assert (result['cohorts'], result['rfm'], result['invalid_dates']) == ({}, {}, 0)
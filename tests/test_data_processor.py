@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from utils.data_processor import (
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+
+from conftest import canonical, load_valid
+
+ANALYSES = {
+    'calculate_total_revenue': lambda data: calculate_total_revenue(data),
+    'region_wise_sales': lambda data: region_wise_sales(data),
+    'top_selling_products': lambda data: top_selling_products(data),
+    'top_selling_products_n10': lambda data: top_selling_products(data, n=10),
+    'customer_analysis': lambda data: customer_analysis(data),
+    'daily_sales_trend': lambda data: daily_sales_trend(data),
+    'find_peak_sales_day': lambda data: find_peak_sales_day(data),
+    'low_performing_products': lambda data: low_performing_products(data),
+    'low_performing_products_t50': lambda data: low_performing_products(data, threshold=50)
+}
+
+
+@pytest.mark.parametrize('analysis', sorted(ANALYSES))
+def test_analysis_golden(golden, dataset, analysis):
+    name, filename = dataset
+    result = ANALYSES[analysis](load_valid(filename))
+
+    golden(f'{name}_{analysis}', result, digest=name == 'large')
+
+
+@pytest.mark.parametrize('analysis', ['calculate_total_revenue', 'region_wise_sales',
+                                      'customer_analysis', 'daily_sales_trend'])
+def test_totals_independent_of_row_order(large_file, analysis):
+    # Exact paise sums: shuffling the rows must not change any total
+    valid = load_valid(large_file)
+    shuffled = list(valid)
+    random.Random(7).shuffle(shuffled)
+
+    assert canonical(ANALYSES[analysis](shuffled)) == canonical(ANALYSES[analysis](valid))
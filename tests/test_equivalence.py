@@ -0,0 +1,185 @@
+"""
+Alternative execution paths must give exactly the results of the plain
+read -> parse -> validate -> analyze pipeline.
+"""
+
+import bz2
+import gzip
+import lzma
+import shutil
+
+import pytest
+
+from utils import cache
+from utils.api_handler import enrich_sales_data
+from utils.cache import TransactionList, file_fingerprint
+from utils.data_processor import customer_analysis, top_selling_products
+from utils.external_agg import (
+    top_customers_external,
+    iter_customers_by_spend,
+    top_selling_products_external
+)
+from utils.file_handler import (
+    read_sales_data,
+    parse_transactions,
+    validate_and_filter,
+    read_transactions_mmap,
+    read_transactions_parallel
+)
+from utils.incremental import new_aggregates, add_transaction, analytics_from_aggregates
+from utils.report_generator import build_report_analytics, generate_sales_report
+
+from conftest import canonical, load_valid, mask_report
+
+
+def _report_text(transactions, tmp_path, **kwargs):
+    output_file = str(tmp_path / 'report.txt')
+    generate_sales_report(transactions, enrich_sales_data(transactions, {}), output_file, **kwargs)
+
+    with open(output_file, encoding='utf-8') as file:
+        return mask_report(file.read())
+
+
+def _validate(parsed):
+    valid, _, _ = validate_and_filter(parsed, verbose=False)
+    return valid
+
+
+@pytest.mark.parametrize('opener, suffix', [
+    (gzip.open, '.gz'),
+    (bz2.open, '.bz2'),
+    (lzma.open, '.xz')
+])
+def test_compressed_input(tmp_path, large_file, opener, suffix):
+    compressed = str(tmp_path / ('sales_data.txt' + suffix))
+    with open(large_file, 'rb') as source, opener(compressed, 'wb') as target:
+        shutil.copyfileobj(source, target)
+
+    expected = parse_transactions(read_sales_data(large_file))
+
+    assert read_sales_data(compressed) == read_sales_data(large_file)
+    assert canonical(read_transactions_mmap(compressed)) == canonical(expected)
+    assert canonical(read_transactions_parallel(compressed)) == canonical(expected)
+
+
+def test_mmap_and_parallel_reports(monkeypatch, dataset, tmp_path):
+    import utils.file_handler as file_handler
+
+    _, filename = dataset
+    monkeypatch.setattr(file_handler, 'PARALLEL_MIN_BYTES', 0)
+
+    expected = _report_text(load_valid(filename), tmp_path)
+
+    assert _report_text(_validate(read_transactions_mmap(filename)), tmp_path) == expected
+    assert _report_text(_validate(read_transactions_parallel(filename, workers=4)), tmp_path) == expected
+
+
+def test_incremental_aggregates(dataset):
+    _, filename = dataset
+    valid = load_valid(filename)
+
+    aggregates = new_aggregates()
+    for tx in valid:
+        add_transaction(aggregates, tx)
+
+    assert canonical(analytics_from_aggregates(aggregates)) == canonical(build_report_analytics(valid))
+
+
+def test_incremental_aggregates_in_batches(large_file):
+    # The watcher folds in new rows batch by batch
+    valid = load_valid(large_file)
+
+    aggregates = new_aggregates()
+    for start in range(0, len(valid), 997):
+        for tx in valid[start:start + 997]:
+            add_transaction(aggregates, tx)
+
+        if start == 0:
+            partial = analytics_from_aggregates(aggregates)
+            assert canonical(partial) == canonical(build_report_analytics(valid[:997]))
+
+    assert canonical(analytics_from_aggregates(aggregates)) == canonical(build_report_analytics(valid))
+
+
+@pytest.mark.parametrize('max_groups', [1, 7, 100, 10_000])
+def test_external_aggregation(dataset, tmp_path, max_groups):
+    _, filename = dataset
+    valid = load_valid(filename)
+
+    customers = customer_analysis(valid)
+    top_customers = dict(list(customers.items())[:5])
+
+    assert canonical(top_customers_external(valid, 5, max_groups=max_groups, partitions=4,
+                                            spill_dir=str(tmp_path))) == canonical(top_customers)
+    assert canonical(dict(iter_customers_by_spend(valid, max_groups=max_groups, partitions=4,
+                                                  spill_dir=str(tmp_path)))) == canonical(customers)
+    assert list(customers) == [key for key, _ in iter_customers_by_spend(
+        valid, max_groups=max_groups, partitions=4, spill_dir=str(tmp_path))]
+    assert top_selling_products_external(valid, 5, max_groups=max_groups, partitions=4,
+                                         spill_dir=str(tmp_path)) == top_selling_products(valid, 5)
+
+
+def test_external_aggregation_report(dataset, tmp_path):
+    _, filename = dataset
+    valid = load_valid(filename)
+
+    assert _report_text(valid, tmp_path, max_groups=10) == _report_text(valid, tmp_path)
+
+
+def test_cached_results(large_file):
+    valid = load_valid(large_file)
+
+    first = build_report_analytics(valid)
+    hits_before = cache.cache_stats()['hits']
+    second = build_report_analytics(valid)
+
+    assert cache.cache_stats()['hits'] > hits_before
+    assert canonical(second) == canonical(first)
+    assert canonical(customer_analysis.uncached(valid)) == canonical(customer_analysis(valid))
+
+    # Modifying the list must invalidate its cached results
+    valid.append(valid[0])
+    assert customer_analysis(valid) != second['customers']
+    assert canonical(customer_analysis(valid)) == canonical(customer_analysis.uncached(valid))
+
+
+def test_disk_cache(monkeypatch, large_file, tmp_path):
+    def load():
+        parsed = TransactionList(parse_transactions(read_sales_data(large_file)),
+                                 content_key=file_fingerprint(large_file))
+        return _validate(parsed)
+
+    cache.configure_cache(disk_dir=str(tmp_path / 'cache'))
+    expected = build_report_analytics(load())
+
+    # A new process would start with an empty memory tier
+    cache.clear_cache()
+    result = build_report_analytics(load())
+
+    assert cache.cache_stats()['disk_hits'] > 0
+    assert canonical(result) == canonical(expected)
+    assert canonical(result) == canonical(build_report_analytics(load_valid(large_file)))
+
+
+def test_external_aggregation_respects_max_groups(monkeypatch, large_file, tmp_path):
+    import utils.external_agg as external_agg
+
+    merge_sizes = []
+    merge_spill_file = external_agg._merge_spill_file
+
+    def recording(*args, **kwargs):
+        for groups in merge_spill_file(*args, **kwargs):
+            merge_sizes.append(len(groups))
+            yield groups
+
+    monkeypatch.setattr(external_agg, '_merge_spill_file', recording)
+
+    valid = load_valid(large_file)
+    top = top_customers_external(valid, 5, max_groups=100, partitions=8, spill_dir=str(tmp_path))
+
+    assert max(merge_sizes) <= 100
+    assert canonical(top) == canonical(dict(list(customer_analysis(valid).items())[:5]))
+    assert list(tmp_path.iterdir()) == []
+
+    with pytest.raises(ValueError):
+        top_customers_external(valid, 5, max_groups=100, partitions=1)
@@ -0,0 +1,207 @@
+import tracemalloc
+
+import pytest
+
+from utils.file_handler import (
+    expand_sales_paths,
+    read_sales_data,
+    read_sales_files,
+    parse_transactions,
+    is_valid_transaction,
+    validate_and_filter,
+    read_transactions_mmap,
+    read_transactions_parallel
+)
+
+from conftest import canonical
+
+
+def test_read_sales_data(golden, sample_file):
+    golden('sample_read_sales_data', read_sales_data(sample_file))
+
+
+def test_read_sales_data_missing_file(tmp_path):
+    assert read_sales_data(str(tmp_path / 'missing.txt')) == []
+
+
+def test_read_sales_data_latin1(tmp_path, sample_file):
+    # Non-UTF-8 files fall back to the next encoding
+    path = tmp_path / 'latin1.txt'
+    text = open(sample_file, encoding='utf-8').read().replace('Mouse', 'Souris é', 1)
+    path.write_bytes(text.encode('latin-1'))
+
+    lines = read_sales_data(str(path))
+    assert any('Souris é' in line for line in lines)
+
+
+def test_parse_transactions(golden, dataset):
+    name, filename = dataset
+    parsed = parse_transactions(read_sales_data(filename))
+    golden(f'{name}_parse_transactions', parsed, digest=name == 'large')
+
+
+def test_is_valid_transaction(sample_file):
+    parsed = parse_transactions(read_sales_data(sample_file))
+    valid = [tx['TransactionID'] for tx in parsed if is_valid_transaction(tx)]
+
+    assert len(valid) == 71
+    assert is_valid_transaction({'TransactionID': 'T1'}) is False
+
+
+def test_out_of_range_prices_are_skipped(tmp_path):
+    lines = [
+        'T1|2024-01-01|P1|X|1|1e100|C1|North',
+        'T2|2024-01-01|P1|X|1|inf|C1|North',
+        'T3|2024-01-01|P1|X|1|1e3|C1|North'
+    ]
+    path = tmp_path / 'sales.txt'
+    path.write_text('header\n' + '\n'.join(lines) + '\n', encoding='utf-8')
+
+    assert [tx['TransactionID'] for tx in parse_transactions(lines)] == ['T3']
+    assert [tx['TransactionID'] for tx in read_transactions_mmap(str(path))] == ['T3']
+
+
+def test_non_finite_amount_filter(sample_file):
+    parsed = parse_transactions(read_sales_data(sample_file))
+
+    with pytest.raises(ValueError):
+        validate_and_filter(parsed, max_amount=float('inf'), verbose=False)
+
+
+def test_validate_and_filter(golden, dataset):
+    name, filename = dataset
+    parsed = parse_transactions(read_sales_data(filename))
+
+    results = {}
+    for label, filters in [
+        ('none', {}),
+        ('north', {'region': 'North'}),
+        ('amount', {'min_amount': 1000, 'max_amount': 50000}),
+        ('north_amount', {'region': 'North', 'min_amount': 1000})
+    ]:
+        valid, invalid_count, summary = validate_and_filter(parsed, verbose=False, **filters)
+        results[label] = {
+            'transaction_ids': [tx['TransactionID'] for tx in valid],
+            'invalid_count': invalid_count,
+            'summary': summary
+        }
+
+    golden(f'{name}_validate_and_filter', results, digest=name == 'large')
+
+
+def test_validate_and_filter_verbose_matches_quiet(capsys, sample_file):
+    parsed = parse_transactions(read_sales_data(sample_file))
+
+    quiet = validate_and_filter(parsed, region='North', verbose=False)
+    loud = validate_and_filter(parsed, region='North')
+
+    assert canonical(quiet) == canonical(loud)
+    assert 'Available regions' in capsys.readouterr().out
+
+
+def test_mmap_reader_matches_parser(dataset):
+    _, filename = dataset
+    expected = parse_transactions(read_sales_data(filename))
+
+    assert canonical(read_transactions_mmap(filename)) == canonical(expected)
+
+
+def test_mmap_reader_columns(sample_file):
+    expected = parse_transactions(read_sales_data(sample_file))
+    rows = read_transactions_mmap(sample_file, columns=['Region', 'Quantity'])
+
+    assert rows == [{'Region': tx['Region'], 'Quantity': tx['Quantity']} for tx in expected]
+
+
+def _decoded_columns(tx):
+    decoded = []
+    for name in ('TransactionID', 'Date', 'ProductID', 'ProductName', 'CustomerID', 'Region'):
+        try:
+            object.__getattribute__(tx, name)
+            decoded.append(name)
+        except AttributeError:
+            pass
+    return decoded
+
+
+def test_lazy_records(monkeypatch, dataset):
+    import utils.file_handler as file_handler
+
+    _, filename = dataset
+    expected = parse_transactions(read_sales_data(filename))
+
+    lazy = read_transactions_mmap(filename, lazy=True)
+    assert all(_decoded_columns(tx) == [] for tx in lazy)
+
+    # Validation and a per-customer pass decode only what they read
+    valid = [tx for tx in lazy if is_valid_transaction(tx)]
+    for tx in valid:
+        tx['CustomerID']
+    assert {tuple(_decoded_columns(tx)) for tx in valid} == \
+        {('TransactionID', 'ProductID', 'CustomerID')}
+
+    assert canonical(lazy) == canonical(expected)
+
+    monkeypatch.setattr(file_handler, 'PARALLEL_MIN_BYTES', 0)
+    assert canonical(read_transactions_parallel(filename, workers=3, lazy=True)) == canonical(expected)
+
+
+def _traced_bytes(read):
+    tracemalloc.start()
+    try:
+        rows = read()
+        return tracemalloc.get_traced_memory()[0], rows
+    finally:
+        tracemalloc.stop()
+
+
+def test_lazy_records_release_the_line(large_file):
+    eager_bytes, eager = _traced_bytes(lambda: read_transactions_mmap(large_file))
+
+    def read_lazy():
+        rows = read_transactions_mmap(large_file, lazy=True)
+        for tx in rows:
+            tx.copy()
+        rows[0]['Region'] = 'North'
+        return rows
+
+    lazy_bytes, lazy = _traced_bytes(read_lazy)
+
+    # Fully decoded records keep no line and no split fields
+    assert all(tx._raw is None for tx in lazy)
+    assert lazy_bytes < 1.15 * eager_bytes
+    assert canonical(lazy[1:]) == canonical(eager[1:])
+
+
+def test_parallel_reader_matches_parser(monkeypatch, dataset):
+    import utils.file_handler as file_handler
+
+    _, filename = dataset
+    expected = parse_transactions(read_sales_data(filename))
+
+    # Force the multi-process path even for small files
+    monkeypatch.setattr(file_handler, 'PARALLEL_MIN_BYTES', 0)
+
+    assert canonical(read_transactions_parallel(filename, workers=3)) == canonical(expected)
+
+
+def test_multi_file_input(tmp_path, large_file):
+    # Split the large file into three shards; a directory and a glob of
+    # the shards must read like the original file
+    with open(large_file, encoding='utf-8') as file:
+        header, *rows = file.readlines()
+
+    shard_dir = tmp_path / 'shards'
+    shard_dir.mkdir()
+    third = len(rows) // 3 + 1
+    for i in range(3):
+        (shard_dir / f'sales_{i}.txt').write_text(header + ''.join(rows[i * third:(i + 1) * third]),
+                                                  encoding='utf-8')
+
+    expected = read_sales_data(large_file)
+    paths = expand_sales_paths(str(shard_dir))
+
+    assert [p.rsplit('/', 1)[-1] for p in paths] == ['sales_0.txt', 'sales_1.txt', 'sales_2.txt']
+    assert read_sales_files(paths, workers=2) == expected
+    assert read_sales_data(str(shard_dir)) == expected
+    assert read_sales_data(str(shard_dir / 'sales_*.txt')) == expected
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import time
+
+import main
+import utils.api_handler as api_handler
+import utils.file_handler as file_handler
+
+from conftest import fake_products, mask_report
+
+# Simulated API latency, and extra time spent reading the sales file
+FETCH_SECONDS = 1.0
+INGEST_SECONDS = 1.0
+
+_read_and_parse = main.read_and_parse
+
+
+def _slow_fetch():
+    time.sleep(FETCH_SECONDS)
+    return fake_products()[:100]
+
+
+def _slow_read_and_parse(*args):
+    time.sleep(INGEST_SECONDS)
+    return _read_and_parse(*args)
+
+
+def _outputs():
+    with open('output/sales_report.txt', encoding='utf-8') as report, \
+            open('data/enriched_sales_data.txt', encoding='utf-8') as enriched:
+        return mask_report(report.read()), enriched.read()
+
+
+def _timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def test_async_pipeline_overlaps_fetch_and_matches_main(monkeypatch, tmp_path, large_file):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('builtins.input', lambda prompt='': 'n')
+    monkeypatch.setattr(api_handler, 'fetch_all_products', _slow_fetch)
+    monkeypatch.setattr(main, 'read_and_parse', _slow_read_and_parse)
+    # Worker processes are started while the fetch thread is running
+    monkeypatch.setattr(file_handler, 'PARALLEL_MIN_BYTES', 0)
+
+    sequential = _timed(lambda: main.main(sales_file=large_file))
+    expected = _outputs()
+
+    # Both runs report errors instead of raising: start from a clean slate
+    os.remove('output/sales_report.txt')
+    os.remove('data/enriched_sales_data.txt')
+
+    pipelined = _timed(lambda: asyncio.run(main.main_async(sales_file=large_file)))
+
+    assert _outputs() == expected
+    # The fetch is hidden behind ingest and analysis instead of added to them
+    assert pipelined < sequential - FETCH_SECONDS / 2
@@ -0,0 +1,113 @@
+import itertools
+import math
+
+import pytest
+
+from utils.product_affinity import build_baskets, product_affinity
+from utils.transaction import Transaction
+
+from conftest import load_valid
+
+
+def _brute_force(transactions, by, min_support):
+    """
+    Counts every product pair of every basket directly, with no pruning
+    """
+
+    baskets = {}
+    for tx in transactions:
+        key = tx['CustomerID'] if by == 'customer' else (tx['CustomerID'], tx['Date'])
+        baskets.setdefault(key, set()).add(tx['ProductName'])
+
+    basket_count = len(baskets)
+    min_count = max(1, math.ceil(min_support * basket_count))
+
+    product_counts = {}
+    pair_counts = {}
+    for basket in baskets.values():
+        for product in basket:
+            product_counts[product] = product_counts.get(product, 0) + 1
+        for pair in itertools.combinations(sorted(basket), 2):
+            pair_counts[pair] = pair_counts.get(pair, 0) + 1
+
+    pairs = {}
+    for (a, b), count in pair_counts.items():
+        if count < min_count:
+            continue
+        pairs[frozenset((a, b))] = {
+            'baskets': count,
+            'support': round(count / basket_count, 4),
+            'confidence': {a: round(count / product_counts[a], 4),
+                           b: round(count / product_counts[b], 4)},
+            'lift': round(count * basket_count / (product_counts[a] * product_counts[b]), 4)
+        }
+
+    frequent = sum(1 for count in product_counts.values() if count >= min_count)
+    return basket_count, frequent, pairs
+
+
+def _by_pair(result):
+    return {
+        frozenset((pair['product_a'], pair['product_b'])): {
+            'baskets': pair['baskets'],
+            'support': pair['support'],
+            'confidence': {pair['product_a']: pair['confidence_a_to_b'],
+                           pair['product_b']: pair['confidence_b_to_a']},
+            'lift': pair['lift']
+        }
+        for pair in result['pairs']
+    }
+
+
+@pytest.mark.parametrize('by', ['customer', 'day'])
+@pytest.mark.parametrize('min_support', [0.0, 0.01, 0.05])
+def test_matches_brute_force(dataset, by, min_support):
+    _, filename = dataset
+    valid = load_valid(filename)
+
+    result = product_affinity(valid, by, min_support, None)
+    basket_count, frequent, expected = _brute_force(valid, by, min_support)
+
+    assert result['baskets'] == basket_count
+    assert result['frequent_products'] == frequent
+    assert _by_pair(result) == expected
+
+    lifts = [(-pair['lift'], -pair['baskets']) for pair in result['pairs']]
+    assert lifts == sorted(lifts)
+
+
+def _tx(customer, date, product):
+    return Transaction(f"T{customer}{date}{product}", date, "P1", product, 1, 10.0, customer, "North")
+
+
+def test_hand_computed_baskets():
+    rows = [
+        _tx('C1', '2024-01-01', 'Tea'), _tx('C1', '2024-01-01', 'Milk'),
+        _tx('C1', '2024-01-02', 'Sugar'),
+        _tx('C2', '2024-01-01', 'Tea'), _tx('C2', '2024-01-01', 'Milk'),
+        _tx('C3', '2024-01-01', 'Tea'),
+        _tx('C4', '2024-01-01', 'Bread')
+    ]
+
+    # Customer baskets: {Tea, Milk, Sugar}, {Tea, Milk}, {Tea}, {Bread}
+    result = product_affinity(rows, 'customer', 0.5, None)
+    assert (result['baskets'], result['products'], result['frequent_products']) == (4, 4, 2)
+    assert result['pairs'] == [{
+        'product_a': 'Tea', 'product_b': 'Milk', 'baskets': 2, 'support': 0.5,
+        'confidence_a_to_b': round(2 / 3, 4), 'confidence_b_to_a': 1.0,
+        'lift': round(2 * 4 / (3 * 2), 4)
+    }]
+
+    # Day baskets split C1's Sugar into its own basket: no Sugar pairs
+    by_day = product_affinity(rows, 'day', 0.0, None)
+    assert by_day['baskets'] == 5
+    assert {(p['product_a'], p['product_b']) for p in by_day['pairs']} == {('Tea', 'Milk')}
+
+
+def test_top_n_and_bad_basket_type(sample_file):
+    valid = load_valid(sample_file)
+
+    assert product_affinity(valid, n=3)['pairs'] == product_affinity(valid, n=None)['pairs'][:3]
+    assert product_affinity([])['pairs'] == []
+    with pytest.raises(ValueError):
+        build_baskets(valid, by='week')
@@ -0,0 +1,92 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils import query_server
+from utils.data_processor import region_wise_sales, top_selling_products
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.query_server import QueryServer
+
+from conftest import load_valid
+
+
+@pytest.fixture
+def server(sample_file):
+    server = QueryServer(('127.0.0.1', 0), parse_transactions(read_sales_data(sample_file)))
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path):
+    try:
+        with urllib.request.urlopen(server.base_url + path, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def _json(value):
+    return json.loads(json.dumps(value))
+
+
+def test_views(server, sample_file):
+    valid = load_valid(sample_file)
+
+    status, summary = _get(server, '/summary')
+    assert status == 200
+    assert summary['total_transactions'] == len(valid)
+
+    assert _get(server, '/regions') == (200, _json(region_wise_sales(valid)))
+
+    status, products = _get(server, '/top-products?n=3')
+    assert [row['product'] for row in products] == \
+        [name for name, _, _ in top_selling_products(valid, 3)]
+
+    status, customers = _get(server, '/customers?limit=2')
+    assert len(customers) == 2
+
+
+def test_filter_view_and_caching(server, sample_file):
+    north, _, _ = validate_and_filter(parse_transactions(read_sales_data(sample_file)),
+                                      region='North', verbose=False)
+
+    status, regions = _get(server, '/filter?region=North&view=regions')
+    assert status == 200
+    assert regions == _json(region_wise_sales(north))
+
+    # The filtered dataset and the encoded response are reused
+    dataset = server.dataset('North')
+    cached = dict(server.responses)
+    assert _get(server, '/filter?view=regions&region=North') == (200, regions)
+    assert server.dataset('North') is dataset
+    assert dict(server.responses) == cached
+
+
+def test_error_responses(monkeypatch, server):
+    status, body = _get(server, '/nope')
+    assert status == 404
+    assert '/summary' in body['queries']
+
+    assert _get(server, '/top-products?n=abc')[0] == 400
+    assert _get(server, '/filter?min_amount=inf')[0] == 400
+    assert _get(server, '/filter?max_amount=1e999')[0] == 400
+
+    def broken(data, params):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(query_server.VIEWS, '/broken', broken)
+    assert _get(server, '/broken') == (500, {'error': 'RuntimeError: boom'})
+
+    # Errors are not cached and the server keeps answering
+    assert not any(key[0] == '/broken' for key in server.responses)
+    assert _get(server, '/summary')[0] == 200
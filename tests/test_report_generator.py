@@ -0,0 +1,59 @@
+from utils.api_handler import create_product_mapping, enrich_sales_data
+from utils.report_generator import (
+    build_report_analytics,
+    summarize_enrichment,
+    generate_sales_report
+)
+
+from conftest import fake_products, load_valid, mask_report
+
+
+def _report(transactions, enriched, tmp_path, **kwargs):
+    output_file = str(tmp_path / 'sales_report.txt')
+    generate_sales_report(transactions, enriched, output_file, **kwargs)
+
+    with open(output_file, encoding='utf-8') as file:
+        return mask_report(file.read())
+
+
+def test_build_report_analytics(golden, dataset):
+    name, filename = dataset
+    golden(f'{name}_report_analytics', build_report_analytics(load_valid(filename)),
+           digest=name == 'large')
+
+
+def test_summarize_enrichment(golden, sample_file):
+    valid = load_valid(sample_file)
+
+    golden('sample_enrichment_summary', {
+        'none_matched': summarize_enrichment(enrich_sales_data(valid, {})),
+        'all_matched': summarize_enrichment(
+            enrich_sales_data(valid, create_product_mapping(fake_products()))
+        )
+    })
+
+
+def test_generate_sales_report(golden, dataset, tmp_path):
+    name, filename = dataset
+    valid = load_valid(filename)
+
+    # Offline run: nothing is enriched, so every product is listed
+    golden(f'{name}_report_offline.txt', _report(valid, enrich_sales_data(valid, {}), tmp_path))
+
+
+def test_generate_sales_report_enriched(golden, sample_file, tmp_path):
+    valid = load_valid(sample_file)
+    enriched = enrich_sales_data(valid, create_product_mapping(fake_products()))
+
+    golden('sample_report_enriched.txt', _report(valid, enriched, tmp_path))
+
+
+def test_report_is_reproducible(dataset, tmp_path):
+    _, filename = dataset
+    valid = load_valid(filename)
+    enriched = enrich_sales_data(valid, {})
+
+    first = _report(valid, enriched, tmp_path)
+    second = _report(load_valid(filename), enriched, tmp_path)
+
+    assert first == second
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from utils.data_processor import calculate_total_revenue, region_wise_sales, daily_sales_trend
+from utils.money import amount_paise, to_rupees
+from utils.sales_cube import build_cube, cube_query, cube_top_products, save_cube, load_cube
+
+from conftest import load_valid
+
+
+def _brute_force(transactions, group_by, region=None, product=None, start_date=None, end_date=None):
+    fields = {'Month': lambda tx: tx['Date'][:7]}
+    groups = {}
+
+    for tx in transactions:
+        if region is not None and tx['Region'] not in region:
+            continue
+        if product is not None and tx['ProductID'] not in product:
+            continue
+        if start_date is not None and tx['Date'] < start_date:
+            continue
+        if end_date is not None and tx['Date'] > end_date:
+            continue
+
+        key = tuple(fields[f](tx) if f in fields else tx[f] for f in group_by)
+        totals = groups.setdefault(key, [0, 0, 0])
+        totals[0] += tx['Quantity']
+        totals[1] += amount_paise(tx)
+        totals[2] += 1
+
+    return [
+        dict(zip(group_by, key), quantity=totals[0], revenue=to_rupees(totals[1]),
+             transactions=totals[2])
+        for key, totals in sorted(groups.items())
+    ]
+
+
+def test_roll_ups_match_data_processor(dataset):
+    _, filename = dataset
+    valid = load_valid(filename)
+    cube = build_cube(valid)
+
+    assert cube_query(cube)[0]['revenue'] == calculate_total_revenue(valid)
+    assert cube_query(cube)[0]['transactions'] == len(valid)
+
+    regions = {row['Region']: row for row in cube_query(cube, ('Region',))}
+    for region, stats in region_wise_sales(valid).items():
+        assert regions[region]['revenue'] == stats['total_sales']
+        assert regions[region]['transactions'] == stats['transaction_count']
+
+    days = {row['Date']: row for row in cube_query(cube, ('Date',))}
+    for date, stats in daily_sales_trend(valid).items():
+        assert days[date]['revenue'] == stats['revenue']
+        assert days[date]['transactions'] == stats['transaction_count']
+
+
+def test_slice_and_dice_match_raw_rows(large_file):
+    valid = load_valid(large_file)
+    cube = build_cube(valid)
+    rng = random.Random(11)
+
+    for _ in range(25):
+        group_by = tuple(rng.sample(['Region', 'ProductID', 'Date', 'Month'], rng.randint(0, 2)))
+        region = rng.sample(cube['regions'], rng.randint(1, 2)) if rng.random() < 0.5 else None
+        product = rng.sample(cube['products'], 5) if rng.random() < 0.3 else None
+        start_date, end_date = sorted(rng.sample(cube['dates'], 2))
+
+        assert cube_query(cube, group_by, region, product, start_date, end_date) == \
+            _brute_force(valid, group_by, region, product, start_date, end_date)
+
+
+def test_top_products_in_region_for_a_week(sample_file):
+    valid = load_valid(sample_file)
+    cube = build_cube(valid)
+
+    top = cube_top_products(cube, 3, 'North', '2024-12-23', '2024-12-29', by='revenue')
+    expected = sorted(_brute_force(valid, ('ProductID',), ['North'], None, '2024-12-23', '2024-12-29'),
+                      key=lambda row: row['revenue'], reverse=True)[:3]
+
+    assert [(row['ProductID'], row['revenue']) for row in top] == \
+        [(row['ProductID'], row['revenue']) for row in expected]
+    assert all(row['ProductName'] for row in top)
+
+
+def test_unknown_values_and_fields(sample_file):
+    cube = build_cube(load_valid(sample_file))
+
+    assert cube_query(cube, ('Region',), region='Atlantis') == []
+    assert cube_query(cube, start_date='2030-01-01') == []
+    with pytest.raises(ValueError):
+        cube_query(cube, ('Customer',))
+
+
+def test_save_and_load(large_file, tmp_path):
+    cube = build_cube(load_valid(large_file))
+    path = str(tmp_path / 'cubes' / 'sales.cube')
+
+    save_cube(cube, path)
+    loaded = load_cube(path)
+
+    assert loaded == cube
+    assert cube_query(loaded, ('Month', 'Region')) == cube_query(cube, ('Month', 'Region'))
+
+
+def test_load_rejects_other_files(sample_file):
+    with pytest.raises(ValueError):
+        load_cube(sample_file)
@@ -0,0 +1,148 @@
+import gzip
+import shutil
+
+import pytest
+
+from utils.api_handler import create_product_mapping, enrich_sales_data, save_enriched_data
+from utils.customer_behavior import analyze_customer_behavior, analyze_customer_behavior_file
+from utils.data_processor import customer_analysis, daily_sales_trend, find_peak_sales_day
+from utils.file_handler import (
+    read_sales_data,
+    sort_sales_file,
+    iter_transactions,
+    is_valid_transaction
+)
+
+from conftest import canonical, fake_products, load_valid
+
+
+def _expected_lines(lines, fields, width=8):
+    def key(line):
+        parts = line.split('|')
+        if len(parts) != width:
+            return ('',) * len(fields)
+        return tuple(parts[index].strip() for index in fields)
+
+    return sorted(lines, key=key)
+
+
+@pytest.mark.parametrize('by, fields', [
+    ('Date', [1]),
+    ('CustomerID', [6]),
+    (['CustomerID', 'Date'], [6, 1])
+])
+def test_external_sort_matches_sorted(large_file, tmp_path, by, fields):
+    output = str(tmp_path / 'sorted.txt')
+
+    # A tiny budget forces many runs
+    count = sort_sales_file(large_file, output, by=by, memory_limit=100_000,
+                            temp_dir=str(tmp_path))
+
+    expected = _expected_lines(read_sales_data(large_file), fields)
+    assert count == len(expected)
+    assert read_sales_data(output) == expected
+    assert open(output).readline() == open(large_file).readline()
+    assert [path.name for path in tmp_path.iterdir()] == ['sorted.txt']
+
+
+def test_sort_directory_and_compressed_input(sample_file, tmp_path):
+    folder = tmp_path / 'daily'
+    folder.mkdir()
+    shutil.copy(sample_file, folder / 'a.txt')
+    with open(sample_file, 'rb') as source, gzip.open(folder / 'b.txt.gz', 'wb') as target:
+        target.write(source.read())
+
+    output = str(tmp_path / 'sorted.txt')
+    count = sort_sales_file(str(folder), output, memory_limit=2_000)
+
+    lines = read_sales_data(sample_file)
+    assert count == 2 * len(lines)
+    assert read_sales_data(output) == _expected_lines(lines + lines, [1])
+
+
+def test_sort_enriched_file(large_file, tmp_path):
+    # Enriched files have 12 columns; positions come from the header
+    enriched_file = str(tmp_path / 'data' / 'enriched.txt')
+    save_enriched_data(enrich_sales_data(load_valid(large_file),
+                                         create_product_mapping(fake_products())),
+                       enriched_file)
+    lines = read_sales_data(enriched_file)
+
+    for by, fields in [('Date', [1]), (['API_Match', 'CustomerID'], [11, 6])]:
+        output = str(tmp_path / 'sorted.txt')
+        count = sort_sales_file(enriched_file, output, by=by, memory_limit=50_000)
+
+        assert count == len(lines)
+        assert read_sales_data(output) == _expected_lines(lines, fields, width=12)
+        assert read_sales_data(output) != lines
+
+
+def test_sort_column_errors(large_file, sample_file, tmp_path):
+    with pytest.raises(ValueError, match='API_Match'):
+        sort_sales_file(large_file, str(tmp_path / 'out.txt'), by='API_Match')
+
+    folder = tmp_path / 'mixed'
+    folder.mkdir()
+    shutil.copy(sample_file, folder / 'a.txt')
+    save_enriched_data(enrich_sales_data(load_valid(sample_file), {}), str(folder / 'b.txt'))
+
+    with pytest.raises(ValueError, match='columns'):
+        sort_sales_file(str(folder), str(tmp_path / 'out.txt'))
+    assert not (tmp_path / 'out.txt').exists()
+
+
+def test_sort_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        sort_sales_file(str(tmp_path / 'missing.txt'), str(tmp_path / 'out.txt'))
+
+
+def test_iter_transactions_matches_parser(large_file):
+    streamed = list(iter_transactions(large_file, batch_size=777))
+    assert [tx['TransactionID'] for tx in streamed] == \
+        [tx['TransactionID'] for tx in iter_transactions(large_file)]
+    assert {tx['TransactionID'] for tx in load_valid(large_file)} <= \
+        {tx['TransactionID'] for tx in streamed}
+
+
+@pytest.mark.parametrize('order', ['unsorted', 'Date', 'CustomerID'])
+def test_sorted_input_gives_same_results(dataset, order):
+    _, filename = dataset
+    valid = load_valid(filename)
+    rows = valid if order == 'unsorted' else sorted(valid, key=lambda tx: tx[order])
+
+    assert canonical(daily_sales_trend.uncached(rows)) == canonical(daily_sales_trend.uncached(valid))
+    assert find_peak_sales_day.uncached(rows) == find_peak_sales_day.uncached(valid)
+    assert canonical(customer_analysis.uncached(rows)) == canonical(customer_analysis.uncached(valid))
+
+
+def test_behavior_from_file_matches_in_memory(dataset, tmp_path):
+    _, filename = dataset
+    result = analyze_customer_behavior_file(filename, memory_limit=50_000, temp_dir=str(tmp_path))
+
+    assert canonical(result) == canonical(analyze_customer_behavior(load_valid(filename)))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_streaming_group_by_from_sorted_file(dataset, tmp_path):
+    _, filename = dataset
+    valid = load_valid(filename)
+
+    by_date = str(tmp_path / 'by_date.txt')
+    by_customer = str(tmp_path / 'by_customer.txt')
+    sort_sales_file(filename, by_date, by='Date')
+    sort_sales_file(filename, by_customer, by='CustomerID')
+
+    def stream(path):
+        return (tx for tx in iter_transactions(path) if is_valid_transaction(tx))
+
+    assert canonical(daily_sales_trend(stream(by_date))) == canonical(daily_sales_trend(valid))
+    assert find_peak_sales_day(stream(by_date)) == find_peak_sales_day(valid)
+    assert canonical(customer_analysis(stream(by_customer))) == canonical(customer_analysis(valid))
+
+
+def test_unsorted_iterator_is_rejected(sample_file):
+    # Rows already consumed cannot be read again, so this must not fall back
+    with pytest.raises(ValueError):
+        daily_sales_trend(iter_transactions(sample_file))
+    with pytest.raises(ValueError):
+        customer_analysis(iter(load_valid(sample_file)))
@@ -0,0 +1,107 @@
+import os
+
+from utils.anomaly import find_sales_anomalies
+from utils.incremental import analytics_from_aggregates
+from utils.report_generator import build_report_analytics, summarize_enrichment
+from utils.api_handler import enrich_sales_data
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.watcher import _close_finished_days, _new_state, _scan
+
+from conftest import HEADER, canonical
+
+
+def _write(path, lines, mode='w'):
+    with open(path, mode, encoding='utf-8', newline='') as file:
+        if mode == 'w':
+            file.write(HEADER)
+        file.write(''.join(line + '\n' for line in lines))
+
+
+def _expected(lines):
+    valid, _, _ = validate_and_filter(parse_transactions(lines), verbose=False)
+    return canonical(build_report_analytics(valid)), summarize_enrichment(enrich_sales_data(valid, {}))
+
+
+def _check(state, lines):
+    analytics, enrichment = _expected(lines)
+
+    assert canonical(analytics_from_aggregates(state['aggregates'])) == analytics
+    assert state['enrichment']['total'] == enrichment['total']
+    assert list(state['enrichment']['failed_products']) == \
+        list(dict.fromkeys(enrichment['failed_products']))
+
+
+def test_scan_follows_appended_truncated_and_replaced_files(tmp_path, sample_file):
+    rows = read_sales_data(sample_file)
+    path = str(tmp_path / 'sales_data.txt')
+    state = _new_state()
+
+    # New file
+    _write(path, rows[:40])
+    assert _scan(state, str(tmp_path), 'sales*.txt', {}) is True
+    _check(state, rows[:40])
+    assert _scan(state, str(tmp_path), 'sales*.txt', {}) is False
+
+    # Appended rows; a row without its newline yet is held back
+    with open(path, 'a', encoding='utf-8', newline='') as file:
+        file.write(''.join(row + '\n' for row in rows[40:60]) + rows[60][:10])
+    assert _scan(state, str(tmp_path), 'sales*.txt', {}) is True
+    _check(state, rows[:60])
+
+    with open(path, 'a', encoding='utf-8', newline='') as file:
+        file.write(rows[60][10:] + '\n')
+    assert _scan(state, str(tmp_path), 'sales*.txt', {}) is True
+    _check(state, rows[:61])
+
+    # Truncated: everything is re-read
+    _write(path, rows[:25])
+    assert _scan(state, str(tmp_path), 'sales*.txt', {}) is True
+    _check(state, rows[:25])
+
+    # Replaced by a new file of a larger size (new inode)
+    _write(path + '.tmp', rows[30:])
+    os.replace(path + '.tmp', path)
+    assert _scan(state, str(tmp_path), 'sales*.txt', {}) is True
+    _check(state, rows[30:])
+
+
+def test_scan_multiple_files_and_removal(tmp_path, sample_file):
+    rows = read_sales_data(sample_file)
+    first = str(tmp_path / 'sales_1.txt')
+    second = str(tmp_path / 'sales_2.txt')
+    state = _new_state()
+
+    _write(first, rows[:30])
+    _write(second, rows[30:])
+    _scan(state, str(tmp_path), 'sales*.txt', {})
+    _check(state, rows)
+
+    # A removed file drops its rows
+    os.remove(second)
+    assert _scan(state, str(tmp_path), 'sales*.txt', {}) is True
+    _check(state, rows[:30])
+
+
+def test_report_leaves_out_the_open_day(tmp_path, large_file, capsys):
+    valid = sorted(validate_and_filter(parse_transactions(read_sales_data(large_file)),
+                                       verbose=False)[0], key=lambda tx: tx['Date'])
+    last = valid[-1]['Date']
+    finished = [tx for tx in valid if tx['Date'] < last]
+
+    # The feed stops a few rows into the newest day
+    path = str(tmp_path / 'sales_data.txt')
+    rows = finished + [tx for tx in valid if tx['Date'] == last][:3]
+    _write(path, ['|'.join(str(tx[field]) for field in HEADER.strip().split('|')) for tx in rows])
+
+    state = _new_state()
+    _scan(state, str(tmp_path), 'sales*.txt', {})
+    _close_finished_days(state['aggregates'])
+
+    anomalies = analytics_from_aggregates(state['aggregates'], open_days=False)['anomalies']
+    assert canonical(anomalies) == canonical(find_sales_anomalies(finished))
+    assert all(anomaly['date'] < last for anomaly in anomalies)
+    assert capsys.readouterr().out.count('ALERT') == len(anomalies)
+
+    # Scored as it stands, the partial day would be reported as a drop
+    provisional = analytics_from_aggregates(state['aggregates'])['anomalies']
+    assert any(anomaly['date'] == last and anomaly['type'] == 'drop' for anomaly in provisional)
@@ -0,0 +1,255 @@
+#----------Streaming Sales Anomaly Detection----------
+
+# Flags unusual days in the daily revenue of every region, every product
+# and the business as a whole.
+#
+# Each series keeps only a running mean/variance (Welford's algorithm) and
+# an exponentially weighted moving average (EWMA) of its daily revenue, so
+# the state is O(1) per series no matter how many days have been seen. A
+# day is scored against the state built from the days before it:
+#   spike - revenue more than Z_THRESHOLD standard deviations above the mean
+#   drop  - revenue below (1 - DROP_RATIO) x the EWMA and more than DROP_Z
+#           standard deviations below the mean
+#
+# The timeline is the set of dates that have any sales; a series with no
+# sales on such a day counts as zero revenue for that day. Series that sell
+# on fewer than MIN_ACTIVE_SHARE of their days (e.g. a slow-moving product)
+# are not scored: for them any single sale would look like an outlier.
+# The standard deviation used for scoring is at least MIN_STD_SHARE of the
+# mean, so that a series with a flat history can still be flagged.
+
+import math
+
+from utils.cache import memoize_analysis
+from utils.money import amount_paise, to_rupees
+
+Z_THRESHOLD = 3.0
+DROP_RATIO = 0.5
+DROP_Z = 2.0
+EWMA_ALPHA = 0.3
+
+# Floor of the standard deviation, as a share of the mean
+MIN_STD_SHARE = 0.05
+
+# Days of history a series needs before it can be flagged
+MIN_HISTORY = 7
+
+# Share of those days on which the series must have had sales
+MIN_ACTIVE_SHARE = 0.5
+
+# Anomalies of closed days kept by a long-running detector
+MAX_ANOMALIES = 200
+
+# Report order of the series dimensions
+DIMENSIONS = ('Total', 'Region', 'Product')
+
+
+def new_detector():
+    """
+    Creates an empty streaming detector
+
+    Rows are collected per open day; close_days scores finished days and
+    folds them into the per-series state.
+
+    Returns: dictionary holding the detector state
+    """
+
+    return {
+        'series': {},        # (dimension, name) -> [days, active_days, mean, m2, ewma]
+        'open_days': {},     # date -> {(dimension, name): revenue_paise}
+        'last_closed': None,
+        'anomalies': [],
+        'late_rows': 0
+    }
+
+
+def observe_transaction(detector, tx):
+    """
+    Adds one valid transaction to the revenue of its (open) day
+
+    Rows for a day that has already been closed cannot change its score;
+    they are only counted in detector['late_rows'].
+    """
+
+    date = tx['Date']
+
+    if detector['last_closed'] is not None and date <= detector['last_closed']:
+        detector['late_rows'] += 1
+        return
+
+    totals = detector['open_days'].get(date)
+    if totals is None:
+        totals = detector['open_days'][date] = {}
+
+    amount = amount_paise(tx)
+    for key in (('Total', 'All'), ('Region', tx['Region']), ('Product', tx['ProductName'])):
+        totals[key] = totals.get(key, 0) + amount
+
+
+def _score_day(series, date, totals):
+    """
+    Scores one day for every known series, then updates their state
+
+    Returns: list of anomalies found on this day
+    """
+
+    anomalies = []
+
+    # Series first seen today start their history today
+    for key in totals:
+        if key not in series:
+            series[key] = [0, 0, 0.0, 0.0, None]
+
+    for key, state in series.items():
+        value = totals.get(key, 0)
+        days, active_days, mean, m2, ewma = state
+
+        if days >= MIN_HISTORY and active_days >= MIN_ACTIVE_SHARE * days:
+            std = max(math.sqrt(m2 / (days - 1)), MIN_STD_SHARE * mean)
+            z_score = (value - mean) / std
+
+            kind = expected = None
+            if z_score > Z_THRESHOLD:
+                kind, expected = 'spike', mean
+            elif value < (1 - DROP_RATIO) * ewma and z_score < -DROP_Z:
+                kind, expected = 'drop', ewma
+
+            if kind is not None:
+                anomalies.append({
+                    'date': date,
+                    'dimension': key[0],
+                    'name': key[1],
+                    'type': kind,
+                    'revenue': to_rupees(value),
+                    'expected': round(to_rupees(expected), 2),
+                    'z_score': round(z_score, 2)
+                })
+
+        # Welford update of mean and variance, then the EWMA
+        days += 1
+        if value:
+            active_days += 1
+        delta = value - mean
+        mean += delta / days
+        m2 += delta * (value - mean)
+        ewma = value if ewma is None else EWMA_ALPHA * value + (1 - EWMA_ALPHA) * ewma
+
+        state[:] = days, active_days, mean, m2, ewma
+
+    return anomalies
+
+
+def _sort_key(anomaly):
+    return (anomaly['date'], DIMENSIONS.index(anomaly['dimension']), anomaly['name'])
+
+
+def close_days(detector, before=None):
+    """
+    Scores the open days up to (not including) `before` in date order
+
+    A long-running process calls this with the newest date it has seen, so
+    the current day stays open while rows are still arriving for it.
+
+    Parameters:
+        before (str): 'YYYY-MM-DD'; None closes every open day
+
+    Returns: list of the anomalies found on the closed days
+    """
+
+    dates = sorted(date for date in detector['open_days'] if before is None or date < before)
+
+    found = []
+    for date in dates:
+        found.extend(_score_day(detector['series'], date, detector['open_days'].pop(date)))
+        detector['last_closed'] = date
+
+    found.sort(key=_sort_key)
+
+    detector['anomalies'].extend(found)
+    del detector['anomalies'][:-MAX_ANOMALIES]
+
+    return found
+
+
+def detect_anomalies(detector):
+    """
+    Returns the anomalies of the closed days plus those of the open days
+    as they stand now, without closing anything
+
+    Returns: list of anomaly dictionaries sorted by date
+    """
+
+    # Score the open days on a copy of the per-series state
+    series = {key: list(state) for key, state in detector['series'].items()}
+
+    found = []
+    for date in sorted(detector['open_days']):
+        found.extend(_score_day(series, date, detector['open_days'][date]))
+
+    return detector['anomalies'] + sorted(found, key=_sort_key)
+
+
+class _NotDateOrdered(Exception):
+    """
+    Raised when rows expected in date order go back in time
+    """
+
+
+def _detect_date_ordered(transactions):
+    """
+    Scores date-ordered rows, closing each day as soon as the next starts,
+    so only one day is ever open
+
+    Raises:
+        _NotDateOrdered: At the first row dated before the current day
+    """
+
+    detector = new_detector()
+    found = []
+    current = None
+
+    for tx in transactions:
+        date = tx['Date']
+        if current is None or date > current:
+            found.extend(close_days(detector, date))
+            current = date
+        elif date < current:
+            raise _NotDateOrdered(date)
+
+        observe_transaction(detector, tx)
+
+    found.extend(close_days(detector))
+
+    return found
+
+
+@memoize_analysis
+def find_sales_anomalies(transactions):
+    """
+    Finds outlier days and sudden drops in daily revenue per region,
+    per product and in total
+
+    Date-ordered input is scored in one pass with O(1) memory per series.
+    Other lists keep every day open until the end. A one-pass iterator
+    must be date-ordered.
+
+    Returns: list of anomaly dictionaries sorted by date, each with date,
+             dimension ('Total', 'Region' or 'Product'), name, type
+             ('spike' or 'drop'), revenue, expected and z_score
+
+    Raises:
+        ValueError: If a one-pass iterator is not in date order
+    """
+
+    try:
+        return _detect_date_ordered(transactions)
+    except _NotDateOrdered as e:
+        if iter(transactions) is transactions:
+            raise ValueError(f"one-pass input is not sorted by Date at {e.args[0]!r}; "
+                             f"pass a list or sort the file with sort_sales_file")
+
+    detector = new_detector()
+    for tx in transactions:
+        observe_transaction(detector, tx)
+
+    return close_days(detector)
@@ -1,35 +1,33 @@
 #----------Task 3.1: Fetch Product Details----------
 
-#--a)Fetch all products--
-
-import requests
+import time
 
+#--a)Fetch all products--
 
 def fetch_all_products():
     """
     Fetches all products from DummyJSON API
 
+    Uses connect/read timeouts, bounded retries and a circuit breaker; when
+    the API cannot be reached, the last successfully fetched catalog
+    (data/product_catalog.json) is used instead.
+
     Returns: list of product dictionaries
     """
 
-    url = "https://dummyjson.com/products?limit=100"
+    from utils.product_client import fetch_products, get_client_metrics
 
-    try:
-        # Send request to API
-        response = requests.get(url)
-        response.raise_for_status()  # Raises error for bad status codes
-
-        # Convert response to JSON
-        data = response.json()
+    products, source = fetch_products()
 
+    if source == 'api':
         print("Successfully fetched products from API")
+    elif source == 'fallback':
+        print("Failed to fetch products from API:", get_client_metrics()['last_error'])
+        print(f"Using fallback product catalog ({len(products)} products)")
+    else:
+        print("Failed to fetch products from API:", get_client_metrics()['last_error'])
 
-        # Return list of products
-        return data.get("products", [])
-
-    except requests.exceptions.RequestException as e:
-        print("Failed to fetch products from API:", e)
-        return []
+    return products
 
 
 #--b)Create Product Mapping--
@@ -63,6 +61,9 @@ def enrich_sales_data(transactions, product_mapping):
     Enriches transaction data with API product information
     """
 
+    from utils.product_client import record_enrichment
+
+    started = time.perf_counter()
     enriched_transactions = []
 
     for tx in transactions:
@@ -94,6 +95,13 @@ def enrich_sales_data(transactions, product_mapping):
 
         enriched_transactions.append(enriched_tx)
 
+    # Record latency and match rate for the client metrics
+    record_enrichment(
+        time.perf_counter() - started,
+        len(enriched_transactions),
+        sum(1 for tx in enriched_transactions if tx["API_Match"])
+    )
+
     return enriched_transactions
 
 #---Helper function---
@@ -0,0 +1,303 @@
+#----------Analytics Result Cache----------
+
+import functools
+import os
+import weakref
+from collections import OrderedDict
+
+# hashlib and pickle are imported where they are used: they are only needed
+# for content keys and the disk tier, and would otherwise slow down start-up
+
+
+class TransactionList(list):
+    """
+    List of transactions that tracks its own modifications.
+
+    Every in-place change bumps `version`, so cached analytics computed on
+    an older state of the list are never returned. `content_key` may hold a
+    content hash of the data the list was built from (see file_fingerprint);
+    only lists with a content key can use the on-disk cache tier.
+    """
+
+    def __init__(self, iterable=(), content_key=None):
+        super().__init__(iterable)
+        self.version = 0
+        self.content_key = content_key
+
+    def _changed(self):
+        self.version += 1
+
+
+def _tracking(method_name):
+    """
+    Wraps a list method so that calling it marks the list as changed
+    """
+    original = getattr(list, method_name)
+
+    @functools.wraps(original)
+    def method(self, *args, **kwargs):
+        self._changed()
+        return original(self, *args, **kwargs)
+
+    return method
+
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort',
+              'reverse', '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(TransactionList, _name, _tracking(_name))
+
+
+# ---------------- CACHE STATE ----------------
+
+# Part of every cache key. Bump it whenever an analytics function changes
+# its results (or their format), so that results pickled in the disk tier by
+# an older version are not served any more.
+CACHE_VERSION = 2
+
+# key -> (weak reference to the dataset or None, result)
+_memory_cache = OrderedDict()
+
+_settings = {
+    'max_entries': 128,
+    'disk_dir': None
+}
+
+_stats = {
+    'hits': 0,
+    'disk_hits': 0,
+    'misses': 0
+}
+
+
+def configure_cache(max_entries=None, disk_dir=None):
+    """
+    Changes the cache limits.
+
+    Parameters:
+        max_entries (int): Maximum number of results kept in memory
+                           (least recently used results are evicted first)
+        disk_dir (str): Directory for the on-disk tier; results for datasets
+                        with a content key are also pickled there
+    """
+
+    if max_entries is not None:
+        _settings['max_entries'] = max_entries
+    if disk_dir is not None:
+        os.makedirs(disk_dir, exist_ok=True)
+        _settings['disk_dir'] = disk_dir
+
+    _evict()
+
+
+def clear_cache():
+    """
+    Drops every in-memory result and resets the statistics
+    """
+    _memory_cache.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+
+def cache_stats():
+    """
+    Returns: dictionary with hits, disk_hits, misses and current size
+    """
+    return dict(_stats, size=len(_memory_cache))
+
+
+def _evict():
+    while len(_memory_cache) > _settings['max_entries']:
+        _memory_cache.popitem(last=False)
+
+
+# ---------------- FINGERPRINTS ----------------
+
+def file_fingerprint(filename, chunk_size=1024 * 1024):
+    """
+    Computes a content hash of a file on disk.
+
+    Returns: hex digest string (sha256 of the file contents)
+    """
+
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(transactions):
+    """
+    Builds a cheap fingerprint of a transaction list.
+
+    An unmodified TransactionList with a content key is identified by that
+    key, so the result can be reused across runs. Any other list is
+    identified by its identity, length and version counter; cache entries
+    of such a list are dropped when the list is garbage collected, so its
+    id cannot be reused by another object while the entry exists.
+
+    Note: changes made inside individual records are not tracked; datasets
+    are treated as read-only once validated.
+
+    Returns: tuple
+    """
+
+    version = getattr(transactions, 'version', 0)
+    content_key = getattr(transactions, 'content_key', None)
+
+    if content_key is not None and version == 0:
+        return ('content', content_key)
+
+    return ('identity', id(transactions), len(transactions), version)
+
+
+def derive_content_key(transactions, *params):
+    """
+    Builds the content key of a dataset derived from `transactions` by a
+    deterministic step (e.g. validation with the given filter parameters).
+
+    Returns: hex digest string, or None if the source has no content key
+    """
+
+    fingerprint = dataset_fingerprint(transactions)
+    if fingerprint[0] != 'content':
+        return None
+
+    import hashlib
+
+    return hashlib.sha256(repr((fingerprint[1], params)).encode('utf-8')).hexdigest()
+
+
+# ---------------- MEMOIZATION ----------------
+
+def _call_key(func, args, kwargs):
+    """
+    Normalizes the parameters after the dataset, including defaults, so
+    that f(data) and f(data, 5) share one cache entry when 5 is the default
+    """
+
+    code = func.__code__
+    names = code.co_varnames[1:code.co_argcount]
+    defaults = func.__defaults__ or ()
+
+    values = dict(zip(names[len(names) - len(defaults):], defaults))
+    values.update(zip(names, args))
+    values.update(kwargs)
+
+    return tuple(sorted(values.items()))
+
+
+def _disk_path(key):
+    import hashlib
+
+    digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+    return os.path.join(_settings['disk_dir'], digest + '.pickle')
+
+
+def _load_from_disk(key):
+    import pickle
+
+    try:
+        with open(_disk_path(key), 'rb') as file:
+            return True, pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return False, None
+
+
+def _save_to_disk(key, result):
+    import pickle
+
+    path = _disk_path(key)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        with open(temp_path, 'wb') as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except OSError:
+        # The disk tier is best-effort; the in-memory result is still valid
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _store(key, fingerprint, transactions, result):
+    """
+    Adds a result to the in-memory tier
+
+    Content-keyed results stay valid for any list with the same content and
+    keep no reference to the dataset. Identity-keyed results hold a weak
+    reference that removes the entry when the list is garbage collected.
+    """
+
+    if fingerprint[0] == 'content':
+        reference = None
+    else:
+        def forget(reference, key=key):
+            entry = _memory_cache.get(key)
+            if entry is not None and entry[0] is reference:
+                del _memory_cache[key]
+
+        reference = weakref.ref(transactions, forget)
+
+    _memory_cache[key] = (reference, result)
+    _evict()
+
+
+def memoize_analysis(func):
+    """
+    Decorator caching an analytics function by dataset fingerprint and
+    parameters.
+
+    The first argument is the transaction data. Only a TransactionList is
+    cached: it tracks its own modifications, so a cached result is never
+    stale. Any other input (a plain list, a generator) is passed straight
+    to the function. Cached results are shared between callers and must be
+    treated as read-only.
+
+    The cache only holds weak references to the datasets: results computed
+    on a list are dropped once the list itself is no longer used.
+    """
+
+    @functools.wraps(func)
+    def wrapper(transactions, *args, **kwargs):
+        if not isinstance(transactions, TransactionList):
+            return func(transactions, *args, **kwargs)
+
+        fingerprint = dataset_fingerprint(transactions)
+        key = (CACHE_VERSION, func.__module__, func.__qualname__, fingerprint,
+               _call_key(func, args, kwargs))
+
+        # Step 1: In-memory tier
+        entry = _memory_cache.get(key)
+        if entry is not None and (entry[0] is None or entry[0]() is transactions):
+            _memory_cache.move_to_end(key)
+            _stats['hits'] += 1
+            return entry[1]
+
+        # Step 2: On-disk tier (content-addressed datasets only)
+        use_disk = _settings['disk_dir'] is not None and fingerprint[0] == 'content'
+        if use_disk:
+            found, result = _load_from_disk(key)
+            if found:
+                _stats['disk_hits'] += 1
+                _store(key, fingerprint, transactions, result)
+                return result
+
+        # Step 3: Compute and store
+        _stats['misses'] += 1
+        result = func(transactions, *args, **kwargs)
+
+        _store(key, fingerprint, transactions, result)
+
+        if use_disk:
+            _save_to_disk(key, result)
+
+        return result
+
+    # Uncached access for benchmarks and equivalence checks
+    wrapper.uncached = func
+
+    return wrapper
@@ -0,0 +1,327 @@
+#----------Customer Behavior Analytics----------
+
+# Cohorts, retention, repeat-purchase intervals and RFM scores.
+#
+# customer_analysis only keeps totals per customer. The analytics below
+# need each customer's purchase history in date order, so they are
+# computed in one pass over rows sorted by (CustomerID, Date): every
+# customer's rows are contiguous and only the current customer's state is
+# held while scanning, instead of re-scanning the data once per customer.
+# Files too large to sort in memory are sorted on disk first
+# (analyze_customer_behavior_file).
+
+from datetime import date as _date
+from operator import itemgetter
+
+from utils.money import amount_paise, to_rupees
+
+# Number of score bands used for R, F and M (1 = worst, 5 = best)
+RFM_BINS = 5
+
+_customer_date_key = itemgetter('CustomerID', 'Date')
+
+
+def sort_by_customer_date(transactions):
+    """
+    Returns the transactions sorted by (CustomerID, Date)
+
+    The sort is stable, so rows of the same customer and day keep their
+    file order.
+    """
+    return sorted(transactions, key=_customer_date_key)
+
+
+def _date_ordinal(date_text):
+    """
+    Returns the ordinal day number of a 'YYYY-MM-DD' date, or None if the
+    text is not a date in exactly that format
+    """
+
+    try:
+        day = _date.fromisoformat(date_text)
+    except (TypeError, ValueError):
+        return None
+
+    # fromisoformat also accepts other ISO forms such as '20240105'
+    if day.isoformat() != date_text:
+        return None
+
+    return day.toordinal()
+
+
+def _month_index(date_text):
+    """
+    Converts 'YYYY-MM-DD' into a running month number (year * 12 + month)
+    """
+    return int(date_text[:4]) * 12 + int(date_text[5:7]) - 1
+
+
+def _month_label(month_index):
+    return f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+
+
+def _score(values, bins, higher_is_better=True):
+    """
+    Assigns rank-based scores 1..bins to a list of values
+
+    Equal values always get the same score (the score of their first rank).
+
+    Returns: list of scores in the order of `values`
+    """
+
+    count = len(values)
+    order = sorted(range(count), key=values.__getitem__, reverse=not higher_is_better)
+
+    scores = [0] * count
+    band = 1
+    previous = None
+    for rank, index in enumerate(order):
+        value = values[index]
+        if rank == 0 or value != previous:
+            band = rank * bins // count + 1
+            previous = value
+        scores[index] = band
+
+    return scores
+
+
+def analyze_customer_behavior(transactions, presorted=False, as_of=None, rfm_bins=RFM_BINS):
+    """
+    Computes cohort, retention, repeat-purchase and RFM analytics in a
+    single pass
+
+    Parameters:
+        transactions (iterable): Valid transactions
+        presorted (bool): True if the rows are already sorted by
+                          (CustomerID, Date); they are then consumed as a
+                          stream and never held in memory
+        as_of (str): Reference date 'YYYY-MM-DD' for recency
+                     (default: latest purchase date in the data)
+        rfm_bins (int): Number of score bands for R, F and M
+
+    Returns: dictionary with
+        'cohorts': {first-purchase month: number of customers}
+        'retention': {cohort month: {months since first purchase: % of the
+                      cohort that purchased in that month}}
+        'repeat_purchases': repeat rate and purchase interval statistics
+        'rfm': {CustomerID: recency/frequency/monetary values and scores}
+        'invalid_dates': number of rows skipped because their Date is not
+                         a 'YYYY-MM-DD' date
+
+    Raises:
+        ValueError: If presorted rows are not in (CustomerID, Date) order
+    """
+
+    rows = transactions if presorted else sort_by_customer_date(transactions)
+
+    # Ordinal day number per date string (few distinct dates); None marks
+    # dates that cannot be parsed
+    ordinals = {}
+    invalid_dates = 0
+
+    retention_counts = {}    # cohort month -> {month offset: customers}
+    interval_counts = {}     # days between purchases -> occurrences
+    customers = []           # one summary tuple per customer, in ID order
+
+    current_id = None
+    previous_key = None
+    state = None
+
+    def finish_customer():
+        first_date, last_date, first_month, months, purchase_days, frequency, monetary = state
+
+        cohort = retention_counts.setdefault(first_month, {})
+        for month in months:
+            offset = month - first_month
+            cohort[offset] = cohort.get(offset, 0) + 1
+
+        customers.append((current_id, first_date, last_date, purchase_days, frequency, monetary))
+
+    # Step 1: One pass over the sorted rows
+    for tx in rows:
+        customer_id = tx['CustomerID']
+        date = tx['Date']
+
+        if presorted:
+            key = (customer_id, date)
+            if previous_key is not None and key < previous_key:
+                raise ValueError(
+                    f"transactions are not sorted by (CustomerID, Date) at {key}"
+                )
+            previous_key = key
+
+        if date in ordinals:
+            ordinal = ordinals[date]
+        else:
+            ordinal = ordinals[date] = _date_ordinal(date)
+
+        if ordinal is None:
+            invalid_dates += 1
+            continue
+
+        if customer_id != current_id:
+            if current_id is not None:
+                finish_customer()
+
+            current_id = customer_id
+            month = _month_index(date)
+            # [first_date, last_date, first_month, months, purchase_days,
+            #  frequency, monetary_paise]
+            state = [date, date, month, {month}, 1, 0, 0]
+
+        elif date != state[1]:
+            # A purchase on a new day: record the gap since the last one
+            gap = ordinal - ordinals[state[1]]
+            interval_counts[gap] = interval_counts.get(gap, 0) + 1
+
+            state[1] = date
+            state[3].add(_month_index(date))
+            state[4] += 1
+
+        state[5] += 1
+        state[6] += amount_paise(tx)
+
+    if current_id is not None:
+        finish_customer()
+
+    if not customers:
+        return {
+            'cohorts': {},
+            'retention': {},
+            'repeat_purchases': {
+                'customers': 0,
+                'repeat_customers': 0,
+                'repeat_rate': 0.0,
+                'interval_count': 0,
+                'avg_interval_days': None,
+                'median_interval_days': None,
+                'interval_histogram': {}
+            },
+            'rfm': {},
+            'invalid_dates': invalid_dates
+        }
+
+    # Step 2: Cohort sizes and retention percentages
+    latest_date = max(customer[2] for customer in customers)
+    latest_month = _month_index(latest_date)
+
+    cohorts = {}
+    retention = {}
+    for first_month in sorted(retention_counts):
+        counts = retention_counts[first_month]
+        size = counts[0]
+        label = _month_label(first_month)
+
+        cohorts[label] = size
+        retention[label] = {
+            offset: round(counts.get(offset, 0) / size * 100, 2)
+            for offset in range(latest_month - first_month + 1)
+        }
+
+    # Step 3: Repeat-purchase intervals (from the histogram, so memory
+    # depends on the date range, not on the number of purchases)
+    repeat_customers = sum(1 for customer in customers if customer[3] > 1)
+    interval_count = sum(interval_counts.values())
+
+    avg_interval = None
+    median_interval = None
+    if interval_count:
+        avg_interval = round(
+            sum(gap * count for gap, count in interval_counts.items()) / interval_count, 2
+        )
+
+        # Median: walk the sorted histogram up to the middle position(s)
+        middle = [(interval_count - 1) // 2, interval_count // 2]
+        found = []
+        seen = 0
+        for gap in sorted(interval_counts):
+            seen += interval_counts[gap]
+            while len(found) < 2 and middle[len(found)] < seen:
+                found.append(gap)
+        median_interval = (found[0] + found[1]) / 2
+
+    repeat_purchases = {
+        'customers': len(customers),
+        'repeat_customers': repeat_customers,
+        'repeat_rate': round(repeat_customers / len(customers) * 100, 2),
+        'interval_count': interval_count,
+        'avg_interval_days': avg_interval,
+        'median_interval_days': median_interval,
+        'interval_histogram': dict(sorted(interval_counts.items()))
+    }
+
+    # Step 4: RFM values and rank-based scores
+    reference = _date.fromisoformat(as_of or latest_date).toordinal()
+
+    recency = [reference - ordinals[customer[2]] for customer in customers]
+    frequency = [customer[4] for customer in customers]
+    monetary = [customer[5] for customer in customers]
+
+    r_scores = _score(recency, rfm_bins, higher_is_better=False)
+    f_scores = _score(frequency, rfm_bins)
+    m_scores = _score(monetary, rfm_bins)
+
+    rfm = {}
+    for i, (customer_id, first_date, last_date, purchase_days, _, _) in enumerate(customers):
+        span = ordinals[last_date] - ordinals[first_date]
+        rfm[customer_id] = {
+            'first_purchase': first_date,
+            'last_purchase': last_date,
+            'recency_days': recency[i],
+            'frequency': frequency[i],
+            'monetary': to_rupees(monetary[i]),
+            'purchase_days': purchase_days,
+            'avg_interval_days': round(span / (purchase_days - 1), 2) if purchase_days > 1 else None,
+            'r_score': r_scores[i],
+            'f_score': f_scores[i],
+            'm_score': m_scores[i],
+            'rfm_score': f"{r_scores[i]}{f_scores[i]}{m_scores[i]}"
+        }
+
+    return {
+        'cohorts': cohorts,
+        'retention': retention,
+        'repeat_purchases': repeat_purchases,
+        'rfm': rfm,
+        'invalid_dates': invalid_dates
+    }
+
+
+def analyze_customer_behavior_file(filename, memory_limit=64 * 1024 * 1024, temp_dir=None,
+                                   as_of=None, rfm_bins=RFM_BINS):
+    """
+    Computes the customer behavior analytics of a sales file that may not
+    fit in memory
+
+    The file is sorted by (CustomerID, Date) with an external merge sort
+    within `memory_limit` bytes, then streamed through the single-pass
+    analysis; only one customer's rows are parsed and held at a time.
+    Invalid rows are skipped as in validate_and_filter.
+
+    Parameters:
+        filename (str): Sales file (plain or compressed), directory or glob
+        memory_limit (int): Approximate memory budget of the sort
+        temp_dir (str): Directory for the sorted copy and the sort runs
+
+    Returns: same dictionary as analyze_customer_behavior
+    """
+
+    import os
+    import shutil
+    import tempfile
+
+    from utils.file_handler import sort_sales_file, iter_transactions, is_valid_transaction
+
+    work_dir = tempfile.mkdtemp(prefix='sales_behavior_', dir=temp_dir)
+
+    try:
+        sorted_file = os.path.join(work_dir, 'sorted_sales.txt')
+        sort_sales_file(filename, sorted_file, by=['CustomerID', 'Date'],
+                        memory_limit=memory_limit, temp_dir=work_dir)
+
+        rows = (tx for tx in iter_transactions(sorted_file) if is_valid_transaction(tx))
+
+        return analyze_customer_behavior(rows, presorted=True, as_of=as_of, rfm_bins=rfm_bins)
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -1,7 +1,58 @@
+from itertools import groupby
+from operator import itemgetter
+
+from utils.cache import memoize_analysis
+from utils.money import amount_paise, to_rupees
+
+# All amounts are accumulated as exact integer paise and converted to
+# rupees only in the returned results, so totals are reproducible and do
+# not depend on the order in which transactions are added up.
+
+# Pre-sorted input (e.g. a date-ordered feed, or a file sorted with
+# file_handler.sort_sales_file): the date and customer analyses first try a
+# streaming group-by that keeps only the current group open and needs no
+# hash map or final sort. At the first out-of-order row a list falls back
+# to the general hash-based path, so unsorted lists give the same results.
+# A one-pass iterator (e.g. file_handler.iter_transactions) cannot be read
+# again, so it must be sorted: out-of-order rows raise ValueError instead
+# of silently losing the rows already consumed.
+
+
+class _NotSorted(Exception):
+    """
+    Raised when input that was expected to be sorted is not
+    """
+
+
+def _sorted_runs(transactions, field):
+    """
+    Yields (value, rows) for each run of equal `field` values
+
+    Raises:
+        _NotSorted: As soon as a value is not greater than the previous one
+                    and the input can be read again
+        ValueError: In the same case for a one-pass iterator
+    """
+
+    one_pass = iter(transactions) is transactions
+
+    previous = None
+    for value, rows in groupby(transactions, key=itemgetter(field)):
+        if previous is not None and value <= previous:
+            if one_pass:
+                raise ValueError(
+                    f"one-pass input is not sorted by {field} at {value!r}; "
+                    f"pass a list or sort the file with sort_sales_file"
+                )
+            raise _NotSorted
+        previous = value
+        yield value, rows
+
 #----------Task 2.1: Sales Summary Calculator----------
 
 #--a)Calculate Total Revenue--
 
+@memoize_analysis
 def calculate_total_revenue(transactions):
     """
     Calculates total revenue from all transactions.
@@ -14,20 +65,21 @@ def calculate_total_revenue(transactions):
                sum of (Quantity * UnitPrice) for all transactions
     """
 
-    total_revenue = 0.0
+    total_revenue = 0
 
     # Loop through each transaction
     for tx in transactions:
-        # Calculate revenue for one transaction
-        transaction_revenue = tx['Quantity'] * tx['UnitPrice']
+        # Calculate revenue for one transaction (in paise)
+        transaction_revenue = amount_paise(tx)
 
         # Add to total revenue
         total_revenue += transaction_revenue
 
-    return total_revenue
+    return to_rupees(total_revenue)
 
 #--b)Region-wise Sales Anaysis--
 
+@memoize_analysis
 def region_wise_sales(transactions):
     """
     Analyzes sales by region.
@@ -40,19 +92,19 @@ def region_wise_sales(transactions):
     """
 
     region_stats = {}
-    overall_total = 0.0
+    overall_total = 0
 
-    # Step 1: Calculate total sales per region and overall total
+    # Step 1: Calculate total sales per region and overall total (in paise)
     for tx in transactions:
         region = tx['Region']
-        amount = tx['Quantity'] * tx['UnitPrice']
+        amount = amount_paise(tx)
 
         overall_total += amount
 
         # Initialize region entry if not present
         if region not in region_stats:
             region_stats[region] = {
-                'total_sales': 0.0,
+                'total_sales': 0,
                 'transaction_count': 0
             }
 
@@ -61,9 +113,11 @@ def region_wise_sales(transactions):
         region_stats[region]['transaction_count'] += 1
 
     # Step 2: Calculate percentage of total sales for each region
+    # and convert totals to rupees
     for region in region_stats:
         percentage = (region_stats[region]['total_sales'] / overall_total) * 100
         region_stats[region]['percentage'] = round(percentage, 2)
+        region_stats[region]['total_sales'] = to_rupees(region_stats[region]['total_sales'])
 
     # Step 3: Sort regions by total_sales in descending order
     sorted_regions = dict(
@@ -78,6 +132,7 @@ def region_wise_sales(transactions):
 
 #--c)Top Selling Products--
 
+@memoize_analysis
 def top_selling_products(transactions, n=5):
     """
     Finds top n products by total quantity sold
@@ -92,12 +147,12 @@ def top_selling_products(transactions, n=5):
     for tx in transactions:
         product = tx['ProductName']
         quantity = tx['Quantity']
-        revenue = quantity * tx['UnitPrice']
+        revenue = amount_paise(tx)
 
         if product not in product_summary:
             product_summary[product] = {
                 'total_quantity': 0,
-                'total_revenue': 0.0
+                'total_revenue': 0
             }
 
         product_summary[product]['total_quantity'] += quantity
@@ -107,7 +162,7 @@ def top_selling_products(transactions, n=5):
     product_list = [
         (product,
          data['total_quantity'],
-         data['total_revenue'])
+         to_rupees(data['total_revenue']))
         for product, data in product_summary.items()
     ]
 
@@ -119,24 +174,76 @@ def top_selling_products(transactions, n=5):
 
 #--d)Customer Purchase Analysis--
 
+@memoize_analysis
 def customer_analysis(transactions):
     """
     Analyzes customer purchase patterns
 
+    Accepts a list, or a one-pass iterator sorted by CustomerID.
+
     Returns: dictionary of customer statistics
     """
 
+    try:
+        customer_data = _customer_data_sorted(transactions)
+    except _NotSorted:
+        customer_data = _customer_data_hashed(transactions)
+
+    # Sort customers by total_spent (descending)
+    sorted_customers = dict(
+        sorted(
+            customer_data.items(),
+            key=lambda item: item[1]['total_spent'],
+            reverse=True
+        )
+    )
+
+    return sorted_customers
+
+
+def _customer_data_sorted(transactions):
+    """
+    Per-customer statistics of input sorted by CustomerID (one open group)
+    """
+
+    customer_data = {}
+
+    for customer_id, rows in _sorted_runs(transactions, 'CustomerID'):
+        total = 0
+        count = 0
+        products = set()
+
+        for tx in rows:
+            total += amount_paise(tx)
+            count += 1
+            products.add(tx['ProductName'])
+
+        customer_data[customer_id] = {
+            'total_spent': to_rupees(total),
+            'purchase_count': count,
+            'products_bought': list(products),
+            'avg_order_value': round(to_rupees(total) / count, 2)
+        }
+
+    return customer_data
+
+
+def _customer_data_hashed(transactions):
+    """
+    Per-customer statistics of input in any order
+    """
+
     customer_data = {}
 
     # Step 1: Aggregate data per customer
     for tx in transactions:
         customer_id = tx['CustomerID']
         product = tx['ProductName']
-        amount = tx['Quantity'] * tx['UnitPrice']
+        amount = amount_paise(tx)
 
         if customer_id not in customer_data:
             customer_data[customer_id] = {
-                'total_spent': 0.0,
+                'total_spent': 0,
                 'purchase_count': 0,
                 'products_bought': set()
             }
@@ -145,49 +252,51 @@ def customer_analysis(transactions):
         customer_data[customer_id]['purchase_count'] += 1
         customer_data[customer_id]['products_bought'].add(product)
 
-    # Step 2: Calculate average order value and convert sets to lists
+    # Step 2: Calculate average order value, convert totals to rupees
+    # and sets to lists
     for customer in customer_data:
         total = customer_data[customer]['total_spent']
         count = customer_data[customer]['purchase_count']
 
-        customer_data[customer]['avg_order_value'] = round(total / count, 2)
+        customer_data[customer]['total_spent'] = to_rupees(total)
+        customer_data[customer]['avg_order_value'] = round(to_rupees(total) / count, 2)
         customer_data[customer]['products_bought'] = list(
             customer_data[customer]['products_bought']
         )
 
-    # Step 3: Sort customers by total_spent (descending)
-    sorted_customers = dict(
-        sorted(
-            customer_data.items(),
-            key=lambda item: item[1]['total_spent'],
-            reverse=True
-        )
-    )
-
-    return sorted_customers
+    return customer_data
 
 #----------Task 2.2: Date-based Analysis----------
 
 #--a)Daily Sales Trend--
 
+@memoize_analysis
 def daily_sales_trend(transactions):
     """
     Analyzes sales trends by date
 
+    Accepts a list, or a one-pass iterator sorted by Date.
+
     Returns: dictionary sorted by date
     """
 
+    # Date-ordered input: one day at a time, already in output order
+    try:
+        return _daily_trend_sorted(transactions)
+    except _NotSorted:
+        pass
+
     daily_data = {}
 
     # Step 1: Aggregate data by date
     for tx in transactions:
         date = tx['Date']
-        revenue = tx['Quantity'] * tx['UnitPrice']
+        revenue = amount_paise(tx)
         customer = tx['CustomerID']
 
         if date not in daily_data:
             daily_data[date] = {
-                'revenue': 0.0,
+                'revenue': 0,
                 'transaction_count': 0,
                 'unique_customers': set()
             }
@@ -196,8 +305,9 @@ def daily_sales_trend(transactions):
         daily_data[date]['transaction_count'] += 1
         daily_data[date]['unique_customers'].add(customer)
 
-    # Step 2: Convert customer sets to counts
+    # Step 2: Convert revenue to rupees and customer sets to counts
     for date in daily_data:
+        daily_data[date]['revenue'] = to_rupees(daily_data[date]['revenue'])
         daily_data[date]['unique_customers'] = len(
             daily_data[date]['unique_customers']
         )
@@ -207,25 +317,73 @@ def daily_sales_trend(transactions):
 
     return sorted_daily_data
 
+
+def _daily_trend_sorted(transactions):
+    """
+    Daily statistics of input sorted by Date (one open group)
+    """
+
+    daily_data = {}
+
+    for date, rows in _sorted_runs(transactions, 'Date'):
+        revenue = 0
+        count = 0
+        customers = set()
+
+        for tx in rows:
+            revenue += amount_paise(tx)
+            count += 1
+            customers.add(tx['CustomerID'])
+
+        daily_data[date] = {
+            'revenue': to_rupees(revenue),
+            'transaction_count': count,
+            'unique_customers': len(customers)
+        }
+
+    return daily_data
+
 #--b)Find Peak Sales day--
 
+@memoize_analysis
 def find_peak_sales_day(transactions):
     """
     Identifies the date with highest revenue
 
+    Accepts a list, or a one-pass iterator sorted by Date.
+
     Returns: tuple (date, revenue, transaction_count)
     """
 
+    # Date-ordered input: O(1) state, only the best day so far is kept
+    try:
+        peak = None
+        for date, rows in _sorted_runs(transactions, 'Date'):
+            revenue = 0
+            count = 0
+            for tx in rows:
+                revenue += amount_paise(tx)
+                count += 1
+
+            # Strictly greater: ties keep the earliest date, like max()
+            if peak is None or revenue > peak[1]:
+                peak = (date, revenue, count)
+
+        if peak is not None:
+            return (peak[0], to_rupees(peak[1]), peak[2])
+    except _NotSorted:
+        pass
+
     daily_summary = {}
 
     # Step 1: Aggregate revenue and transaction count per date
     for tx in transactions:
         date = tx['Date']
-        revenue = tx['Quantity'] * tx['UnitPrice']
+        revenue = amount_paise(tx)
 
         if date not in daily_summary:
             daily_summary[date] = {
-                'revenue': 0.0,
+                'revenue': 0,
                 'transaction_count': 0
             }
 
@@ -241,7 +399,7 @@ def find_peak_sales_day(transactions):
     # Step 3: Return required tuple
     return (
         peak_date[0],
-        peak_date[1]['revenue'],
+        to_rupees(peak_date[1]['revenue']),
         peak_date[1]['transaction_count']
     )
 
@@ -249,6 +407,7 @@ def find_peak_sales_day(transactions):
 
 #--a)Low Performing Products--
 
+@memoize_analysis
 def low_performing_products(transactions, threshold=10):
     """
     Identifies products with low sales
@@ -263,12 +422,12 @@ def low_performing_products(transactions, threshold=10):
     for tx in transactions:
         product = tx['ProductName']
         quantity = tx['Quantity']
-        revenue = quantity * tx['UnitPrice']
+        revenue = amount_paise(tx)
 
         if product not in product_summary:
             product_summary[product] = {
                 'total_quantity': 0,
-                'total_revenue': 0.0
+                'total_revenue': 0
             }
 
         product_summary[product]['total_quantity'] += quantity
@@ -278,7 +437,7 @@ def low_performing_products(transactions, threshold=10):
     low_products = [
         (product,
          data['total_quantity'],
-         data['total_revenue'])
+         to_rupees(data['total_revenue']))
         for product, data in product_summary.items()
         if data['total_quantity'] < threshold
     ]
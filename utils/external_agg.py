@@ -0,0 +1,322 @@
+#----------External (Spill-to-Disk) Aggregation----------
+
+# customer_analysis and top_selling_products keep one dictionary entry per
+# customer or product. The functions below give the same results while
+# holding at most `max_groups` groups in memory: when the limit is reached,
+# the partial groups are hash-partitioned into spill files, and each
+# partition is later merged on its own. A partition that still has more
+# than `max_groups` distinct keys is split again on the next base-`partitions`
+# digit of the key hash, so the limit holds no matter how many customers or
+# products exist.
+
+import heapq
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+
+from utils.money import amount_paise, to_rupees
+
+# Default number of groups held in memory before spilling
+MAX_GROUPS_IN_MEMORY = 1_000_000
+
+# Default number of spill partitions per level
+SPILL_PARTITIONS = 64
+
+# Re-partitioning levels after which a partition is merged in memory
+# regardless of its size (only reached if many keys share their hashes)
+MAX_SPILL_DEPTH = 16
+
+_HASH_MASK = (1 << 64) - 1
+
+
+def _dump(key, partial, spill_files, depth):
+    """
+    Appends one group to the spill file of its hash partition
+
+    Level `depth` uses digit number `depth` of the key hash written in base
+    len(spill_files), so keys sharing a partition at one level are spread
+    over the partitions of the next.
+    """
+    partitions = len(spill_files)
+    index = (hash(key) & _HASH_MASK) // partitions ** depth % partitions
+    pickle.dump((key, partial), spill_files[index], protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _spill(groups, spill_files, depth=0):
+    """
+    Appends every in-memory group to the spill file of its hash partition
+    """
+    for key, partial in groups.items():
+        _dump(key, partial, spill_files, depth)
+    groups.clear()
+
+
+def _read_records(path):
+    """
+    Yields every record pickled into a spill or run file
+    """
+    with open(path, 'rb') as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def _aggregate_partitions(rows, new_partial, update, merge, max_groups, partitions, work_dir):
+    """
+    Groups rows under a memory limit
+
+    Parameters:
+        rows: iterable of (key, row_index, transaction)
+        new_partial: function(row_index) -> empty partial aggregate
+        update: function(partial, transaction) -> None
+        merge: function(partial, other_partial) -> None
+
+    Yields: one dictionary {key: partial} per partition, each with at most
+            max_groups keys
+
+    Raises:
+        ValueError: If fewer than two partitions are requested
+    """
+
+    if partitions < 2:
+        raise ValueError(f"partitions must be at least 2, got {partitions}")
+
+    groups = {}
+    spill_files = None
+
+    for key, index, tx in rows:
+        partial = groups.get(key)
+        if partial is None:
+            # Memory limit reached: move all partial groups to disk
+            if len(groups) >= max_groups:
+                if spill_files is None:
+                    spill_files = [
+                        open(os.path.join(work_dir, f"spill_{i}.pickle"), 'wb')
+                        for i in range(partitions)
+                    ]
+                _spill(groups, spill_files)
+
+            partial = groups[key] = new_partial(index)
+        update(partial, tx)
+
+    # Everything fit in memory: a single partition
+    if spill_files is None:
+        yield groups
+        return
+
+    _spill(groups, spill_files)
+    for file in spill_files:
+        file.close()
+
+    # Merge the partial groups of one partition at a time
+    for i in range(partitions):
+        yield from _merge_spill_file(os.path.join(work_dir, f"spill_{i}.pickle"),
+                                     merge, max_groups, partitions, depth=0)
+
+
+def _merge_spill_file(path, merge, max_groups, partitions, depth):
+    """
+    Merges the partial groups of one spill file
+
+    If the file holds more than max_groups distinct keys, it is split into
+    `partitions` smaller files on the next digit of the key hash, and each
+    of those is merged (recursively) instead.
+
+    Yields: dictionaries {key: partial}
+    """
+
+    merged = {}
+    records = _read_records(path)
+
+    for key, partial in records:
+        existing = merged.get(key)
+        if existing is not None:
+            merge(existing, partial)
+        elif len(merged) < max_groups or depth >= MAX_SPILL_DEPTH:
+            merged[key] = partial
+        else:
+            # Too many groups for one merge: re-partition this file
+            sub_paths = [f"{path}.{i}" for i in range(partitions)]
+            sub_files = [open(sub_path, 'wb') for sub_path in sub_paths]
+            try:
+                _spill(merged, sub_files, depth + 1)
+                _dump(key, partial, sub_files, depth + 1)
+                for other_key, other_partial in records:
+                    _dump(other_key, other_partial, sub_files, depth + 1)
+            finally:
+                for file in sub_files:
+                    file.close()
+
+            os.remove(path)
+            for sub_path in sub_paths:
+                yield from _merge_spill_file(sub_path, merge, max_groups, partitions, depth + 1)
+            return
+
+    os.remove(path)
+    yield merged
+
+
+# ---------------- CUSTOMERS ----------------
+
+# Partial customer aggregate: [total_paise, purchase_count, products, first_seen]
+
+def _new_customer(index):
+    return [0, 0, set(), index]
+
+
+def _update_customer(partial, tx):
+    partial[0] += amount_paise(tx)
+    partial[1] += 1
+    partial[2].add(tx['ProductName'])
+
+
+def _merge_customer(partial, other):
+    partial[0] += other[0]
+    partial[1] += other[1]
+    partial[2] |= other[2]
+    partial[3] = min(partial[3], other[3])
+
+
+def _customer_stats(partial):
+    total_spent = to_rupees(partial[0])
+    return {
+        'total_spent': total_spent,
+        'purchase_count': partial[1],
+        'products_bought': list(partial[2]),
+        'avg_order_value': round(total_spent / partial[1], 2)
+    }
+
+
+def _customer_partitions(transactions, max_groups, partitions, work_dir):
+    rows = ((tx['CustomerID'], index, tx) for index, tx in enumerate(transactions))
+    return _aggregate_partitions(
+        rows, _new_customer, _update_customer, _merge_customer,
+        max_groups, partitions, work_dir
+    )
+
+
+def top_customers_external(transactions, n=5, max_groups=MAX_GROUPS_IN_MEMORY,
+                           partitions=SPILL_PARTITIONS, spill_dir=None):
+    """
+    Finds the top n customers by total spent under a memory limit
+
+    Returns the same entries, in the same order, as the first n items of
+    customer_analysis(transactions); ties keep first-appearance order.
+
+    Parameters:
+        transactions (iterable): Valid transactions (a list or a stream)
+        n (int): Number of customers to return
+        max_groups (int): Customers held in memory before spilling to disk
+        partitions (int): Number of spill partitions
+        spill_dir (str): Directory for spill files (default: system temp)
+
+    Returns: dictionary {CustomerID: stats} of at most n customers
+    """
+
+    work_dir = tempfile.mkdtemp(prefix='sales_spill_', dir=spill_dir)
+
+    try:
+        # Keep only the best n of each partition: O(n) extra memory
+        best = []
+        for groups in _customer_partitions(transactions, max_groups, partitions, work_dir):
+            best = heapq.nsmallest(n, itertools.chain(
+                best,
+                ((-partial[0], partial[3], key, partial) for key, partial in groups.items())
+            ))
+
+        return {key: _customer_stats(partial) for _, _, key, partial in best}
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def iter_customers_by_spend(transactions, max_groups=MAX_GROUPS_IN_MEMORY,
+                            partitions=SPILL_PARTITIONS, spill_dir=None):
+    """
+    Yields every customer sorted by total spent under a memory limit
+
+    Each partition is sorted and written to a run file, and the runs are
+    merged lazily, so the full ranking never has to be held in memory.
+    The order matches customer_analysis(transactions).
+
+    Yields: tuples (CustomerID, stats)
+    """
+
+    work_dir = tempfile.mkdtemp(prefix='sales_spill_', dir=spill_dir)
+
+    try:
+        # Step 1: One sorted run file per partition
+        run_paths = []
+        for groups in _customer_partitions(transactions, max_groups, partitions, work_dir):
+            if not groups:
+                continue
+
+            run_path = os.path.join(work_dir, f"run_{len(run_paths)}.pickle")
+            with open(run_path, 'wb') as file:
+                for record in sorted(
+                    (-partial[0], partial[3], key, partial) for key, partial in groups.items()
+                ):
+                    pickle.dump(record, file, protocol=pickle.HIGHEST_PROTOCOL)
+            run_paths.append(run_path)
+
+        # Step 2: k-way merge of the runs (keys are unique, so the
+        # comparison never reaches the partial aggregates)
+        for _, _, key, partial in heapq.merge(*[_read_records(path) for path in run_paths]):
+            yield key, _customer_stats(partial)
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# ---------------- PRODUCTS ----------------
+
+# Partial product aggregate: [total_quantity, revenue_paise, first_seen]
+
+def _new_product(index):
+    return [0, 0, index]
+
+
+def _update_product(partial, tx):
+    partial[0] += tx['Quantity']
+    partial[1] += amount_paise(tx)
+
+
+def _merge_product(partial, other):
+    partial[0] += other[0]
+    partial[1] += other[1]
+    partial[2] = min(partial[2], other[2])
+
+
+def top_selling_products_external(transactions, n=5, max_groups=MAX_GROUPS_IN_MEMORY,
+                                  partitions=SPILL_PARTITIONS, spill_dir=None):
+    """
+    Finds the top n products by total quantity sold under a memory limit
+
+    Returns the same list as top_selling_products(transactions, n).
+
+    Returns: list of tuples (ProductName, TotalQuantity, TotalRevenue)
+    """
+
+    work_dir = tempfile.mkdtemp(prefix='sales_spill_', dir=spill_dir)
+
+    try:
+        rows = ((tx['ProductName'], index, tx) for index, tx in enumerate(transactions))
+
+        best = []
+        for groups in _aggregate_partitions(
+            rows, _new_product, _update_product, _merge_product,
+            max_groups, partitions, work_dir
+        ):
+            best = heapq.nsmallest(n, itertools.chain(
+                best,
+                ((-partial[0], partial[2], key, partial) for key, partial in groups.items())
+            ))
+
+        return [(key, partial[0], to_rupees(partial[1])) for _, _, key, partial in best]
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
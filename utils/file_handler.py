@@ -1,39 +1,160 @@
+from utils.transaction import Transaction, LazyTransaction, TRANSACTION_FIELDS
+from utils.cache import TransactionList, derive_content_key
+from utils.money import parse_paise, to_paise, to_rupees, amount_paise
+
 #-----Task 1.1: Read Sales Data with Encoding Handling-----
 
+import glob
+import os
+
+# Compressed formats that are decompressed while reading
+# (.zst needs the optional 'zstandard' package)
+COMPRESSED_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zst')
+
+
+def _open_stream(filename, mode, encoding=None):
+    """
+    Opens a plain or compressed sales file for streaming reads or writes.
+
+    Compressed files are decompressed chunk by chunk as lines are read,
+    never to disk or into one large buffer.
+    """
+
+    if filename.endswith('.gz'):
+        import gzip
+        return gzip.open(filename, mode, encoding=encoding)
+
+    if filename.endswith('.bz2'):
+        import bz2
+        return bz2.open(filename, mode, encoding=encoding)
+
+    if filename.endswith('.xz'):
+        import lzma
+        return lzma.open(filename, mode, encoding=encoding)
+
+    if filename.endswith('.zst'):
+        import zstandard
+        return zstandard.open(filename, mode, encoding=encoding)
+
+    return open(filename, mode, encoding=encoding)
+
+
+def _open_text(filename, encoding):
+    """
+    Opens a plain or compressed sales file for streaming text reads.
+    """
+    return _open_stream(filename, 'rt', encoding)
+
+
+def _is_multi_path(path):
+    """
+    Returns True if path is a directory or a glob pattern
+    """
+    return os.path.isdir(path) or any(char in path for char in '*?[')
+
+
+def expand_sales_paths(path):
+    """
+    Lists the sales files named by a path.
+
+    Parameters:
+        path (str): A file, a directory (all non-hidden files in it) or a
+                    glob pattern such as 'archive/sales_*.txt.gz'
+
+    Returns:
+        list: Sorted list of file paths
+    """
+
+    if os.path.isdir(path):
+        candidates = [
+            os.path.join(path, name) for name in os.listdir(path)
+            if not name.startswith('.')
+        ]
+    elif _is_multi_path(path):
+        candidates = glob.glob(path)
+    else:
+        return [path]
+
+    return sorted(candidate for candidate in candidates if os.path.isfile(candidate))
+
+
+def read_sales_files(filenames, workers=None):
+    """
+    Reads several sales files in parallel.
+
+    Decompression runs in C and releases the GIL, so threads are enough
+    to keep several compressed files streaming at once.
+
+    Parameters:
+        filenames (list): Paths of the files to read
+        workers (int): Number of reader threads (default: one per file,
+                       at most the CPU count)
+
+    Returns:
+        list: Raw transaction lines of all files, in the given file order
+    """
+
+    if len(filenames) <= 1:
+        return [line for filename in filenames for line in read_sales_data(filename)]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = workers or min(len(filenames), os.cpu_count() or 1)
+
+    cleaned_lines = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for lines in executor.map(read_sales_data, filenames):
+            cleaned_lines.extend(lines)
+
+    return cleaned_lines
+
+
 def read_sales_data(filename):
     """
     Reads sales data from a file while handling encoding issues.
 
     Parameters:
-        filename (str): Path to the sales data file ('sales_data.txt')
+        filename (str): Path to the sales data file ('sales_data.txt').
+                        Files ending in .gz, .bz2, .xz or .zst are
+                        decompressed on the fly; a directory or a glob
+                        pattern reads every matching file (in parallel).
 
     Returns:
         list: A list of raw transaction lines as strings
               (header removed, empty lines skipped)
     """
 
+    # Directories and globs: every file has its own header
+    if _is_multi_path(filename):
+        filenames = expand_sales_paths(filename)
+        if not filenames:
+            print(f"Error: No sales files found for '{filename}'.")
+            return []
+        return read_sales_files(filenames)
+
     # List of encodings to try (file may not be UTF-8)
     encodings_to_try = ['utf-8', 'latin-1', 'cp1252']
 
     # Try reading the file using each encoding
     for encoding in encodings_to_try:
         try:
-            # Open the file safely using 'with' statement
-            # This ensures the file is closed automatically
-            with open(filename, 'r', encoding=encoding) as file:
-                all_lines = file.readlines()
-
             # This list will store only valid data lines
             cleaned_lines = []
 
-            # Skip the first line because it is the header
-            for line in all_lines[1:]:
-                # Remove leading/trailing whitespace and newline characters
-                line = line.strip()
+            # Open the file safely using 'with' statement
+            # This ensures the file is closed automatically
+            with _open_text(filename, encoding) as file:
+                # Skip the first line because it is the header
+                next(file, None)
 
-                # Ignore empty lines
-                if line:
-                    cleaned_lines.append(line)
+                # Stream the remaining lines instead of loading them all
+                for line in file:
+                    # Remove leading/trailing whitespace and newline characters
+                    line = line.strip()
+
+                    # Ignore empty lines
+                    if line:
+                        cleaned_lines.append(line)
 
             # If reading was successful, return the data lines
             return cleaned_lines
@@ -47,6 +168,16 @@ def read_sales_data(filename):
             print(f"Error: File '{filename}' not found.")
             return []
 
+        except ImportError:
+            # Optional decompressor is not installed
+            print(f"Error: Reading '{filename}' requires the 'zstandard' package.")
+            return []
+
+        except (OSError, EOFError) as e:
+            # Corrupt or truncated compressed file
+            print(f"Error: Unable to read '{filename}': {e}")
+            return []
+
     # If none of the encodings worked
     print("Error: Unable to read file using supported encodings.")
     return []
@@ -61,7 +192,8 @@ def parse_transactions(raw_lines):
         raw_lines (list): List of raw transaction strings
 
     Returns:
-        list: List of dictionaries with cleaned and typed data
+        list: List of Transaction records (dictionary-style access) with
+              cleaned and typed data
     """
 
     transactions = []
@@ -90,24 +222,20 @@ def parse_transactions(raw_lines):
 
         try:
             # Remove commas from numeric fields and convert types
+            # (the price is parsed exactly into integer paise)
             quantity = int(quantity.replace(',', ''))
-            unit_price = float(unit_price.replace(',', ''))
+            price_paise = parse_paise(unit_price)
+            unit_price = to_rupees(price_paise)
 
         except ValueError:
             # Skip rows where conversion fails
             continue
 
-        # Create transaction dictionary
-        transaction = {
-            'TransactionID': transaction_id,
-            'Date': date,
-            'ProductID': product_id,
-            'ProductName': product_name,
-            'Quantity': quantity,
-            'UnitPrice': unit_price,
-            'CustomerID': customer_id,
-            'Region': region
-        }
+        # Create compact transaction record
+        transaction = Transaction(
+            transaction_id, date, product_id, product_name,
+            quantity, unit_price, customer_id, region, price_paise
+        )
 
         # Add cleaned transaction to list
         transactions.append(transaction)
@@ -116,47 +244,57 @@ def parse_transactions(raw_lines):
 
 #-----Task 1.3: Data Validation and Filtering-----
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def is_valid_transaction(tx):
     """
-    Validates transactions and applies optional filters.
+    Checks one transaction against the validation rules.
 
     Returns:
-        tuple: (valid_transactions, invalid_count, filter_summary)
+        bool: True if the transaction passes every rule
     """
 
-    valid_transactions = []
-    invalid_count = 0
+    # Check all required fields exist
+    if not all(field in tx for field in TRANSACTION_FIELDS):
+        return False
 
-    required_fields = [
-        'TransactionID', 'Date', 'ProductID', 'ProductName',
-        'Quantity', 'UnitPrice', 'CustomerID', 'Region'
-    ]
+    # Validation rules
+    if tx['Quantity'] <= 0:
+        return False
 
-    # ---------------- VALIDATION ----------------
-    for tx in transactions:
-        # Check all required fields exist
-        if not all(field in tx for field in required_fields):
-            invalid_count += 1
-            continue
+    if tx['UnitPrice'] <= 0:
+        return False
 
-        # Validation rules
-        if tx['Quantity'] <= 0:
-            invalid_count += 1
-            continue
+    if not tx['TransactionID'].startswith('T'):
+        return False
 
-        if tx['UnitPrice'] <= 0:
-            invalid_count += 1
-            continue
+    if not tx['ProductID'].startswith('P'):
+        return False
 
-        if not tx['TransactionID'].startswith('T'):
-            invalid_count += 1
-            continue
+    if not tx['CustomerID'].startswith('C'):
+        return False
 
-        if not tx['ProductID'].startswith('P'):
-            invalid_count += 1
-            continue
+    return True
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None,
+                        verbose=True):
+    """
+    Validates transactions and applies optional filters.
+
+    Set verbose=False to skip printing the available options and counts
+    (e.g. when called repeatedly by a service).
+
+    Returns:
+        tuple: (valid_transactions, invalid_count, filter_summary)
+               valid_transactions is a TransactionList, so analytics on it
+               are cached until it is modified
+    """
+
+    valid_transactions = []
+    invalid_count = 0
 
-        if not tx['CustomerID'].startswith('C'):
+    # ---------------- VALIDATION ----------------
+    for tx in transactions:
+        if not is_valid_transaction(tx):
             invalid_count += 1
             continue
 
@@ -164,14 +302,15 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         valid_transactions.append(tx)
 
     # ---------------- DISPLAY OPTIONS ----------------
-    regions = sorted({tx['Region'] for tx in valid_transactions})
-    amounts = [tx['Quantity'] * tx['UnitPrice'] for tx in valid_transactions]
+    if verbose:
+        regions = sorted({tx['Region'] for tx in valid_transactions})
+        amounts = [tx['Quantity'] * tx['UnitPrice'] for tx in valid_transactions]
 
-    print("Available regions:", regions)
-    print("Transaction amount range:",
-          min(amounts) if amounts else 0,
-          "to",
-          max(amounts) if amounts else 0)
+        print("Available regions:", regions)
+        print("Transaction amount range:",
+              min(amounts) if amounts else 0,
+              "to",
+              max(amounts) if amounts else 0)
 
     total_input = len(transactions)
 
@@ -188,17 +327,22 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
             tx for tx in filtered_transactions if tx['Region'] == region
         ]
         filtered_by_region = before - len(filtered_transactions)
-        print(f"After region filter ({region}):", len(filtered_transactions))
+        if verbose:
+            print(f"After region filter ({region}):", len(filtered_transactions))
 
     # Apply amount filters
     if min_amount is not None or max_amount is not None:
         before = len(filtered_transactions)
 
+        # Compare exact amounts in paise
+        min_paise = to_paise(min_amount) if min_amount is not None else None
+        max_paise = to_paise(max_amount) if max_amount is not None else None
+
         def amount_valid(tx):
-            amount = tx['Quantity'] * tx['UnitPrice']
-            if min_amount is not None and amount < min_amount:
+            amount = amount_paise(tx)
+            if min_paise is not None and amount < min_paise:
                 return False
-            if max_amount is not None and amount > max_amount:
+            if max_paise is not None and amount > max_paise:
                 return False
             return True
 
@@ -207,7 +351,8 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         ]
 
         filtered_by_amount = before - len(filtered_transactions)
-        print("After amount filter:", len(filtered_transactions))
+        if verbose:
+            print("After amount filter:", len(filtered_transactions))
 
     # ---------------- SUMMARY ----------------
     summary = {
@@ -218,4 +363,487 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         'final_count': len(filtered_transactions)
     }
 
+    # Tracked list: repeated analytics on the same result are served from cache
+    filtered_transactions = TransactionList(
+        filtered_transactions,
+        content_key=derive_content_key(transactions, region, min_amount, max_amount)
+    )
+
     return filtered_transactions, invalid_count, summary
+
+#-----Memory-Mapped Ingest-----
+
+import mmap
+
+# Files smaller than this are parsed in a single process
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+
+def _decode_field(raw):
+    """
+    Decodes one byte field, falling back to latin-1 for non-UTF-8 bytes.
+    """
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def _parse_buffer_range(buffer, start, end, columns, lazy=False):
+    """
+    Parses the lines of a byte buffer between two offsets.
+
+    Only the string columns listed in `columns` are decoded. Quantity and
+    UnitPrice are always parsed straight from the bytes, because a row whose
+    numbers cannot be converted is skipped just like in parse_transactions.
+    With `lazy` (and all columns), full rows become LazyTransaction records
+    that decode each text column only when it is first read.
+    """
+
+    transactions = []
+    all_columns = len(columns) == len(TRANSACTION_FIELDS)
+    lazy = lazy and all_columns
+    decode_fields = [
+        (index, name) for index, name in enumerate(TRANSACTION_FIELDS)
+        if name in columns and name not in ('Quantity', 'UnitPrice')
+    ]
+    keep_quantity = 'Quantity' in columns
+    keep_unit_price = 'UnitPrice' in columns
+
+    position = start
+    while position < end:
+        # Find the end of the current line without copying the buffer
+        newline = buffer.find(b'\n', position, end)
+        if newline == -1:
+            newline = end
+
+        line = buffer[position:newline].strip()
+        position = newline + 1
+
+        # Ignore empty lines
+        if not line:
+            continue
+
+        fields = line.split(b'|')
+
+        # Skip rows with incorrect number of fields
+        if len(fields) != 8:
+            continue
+
+        try:
+            # int() and parse_paise() accept bytes directly
+            quantity = int(fields[4].strip().replace(b',', b''))
+            price_paise = parse_paise(fields[5])
+            unit_price = to_rupees(price_paise)
+        except ValueError:
+            continue
+
+        if lazy:
+            transactions.append(LazyTransaction(line, quantity, unit_price, price_paise))
+            continue
+
+        transaction = {}
+        for index, name in decode_fields:
+            transaction[name] = _decode_field(fields[index].strip())
+
+        # Handle commas in ProductName (e.g., "Mouse,Wireless")
+        if 'ProductName' in transaction:
+            transaction['ProductName'] = transaction['ProductName'].replace(',', ' ')
+
+        # Full rows use the same compact record as parse_transactions
+        if all_columns:
+            transactions.append(Transaction(
+                transaction['TransactionID'], transaction['Date'],
+                transaction['ProductID'], transaction['ProductName'],
+                quantity, unit_price,
+                transaction['CustomerID'], transaction['Region'], price_paise
+            ))
+            continue
+
+        if keep_quantity:
+            transaction['Quantity'] = quantity
+        if keep_unit_price:
+            transaction['UnitPrice'] = unit_price
+
+        # Keep the usual column order for callers that print records
+        transactions.append({
+            name: transaction[name] for name in TRANSACTION_FIELDS if name in transaction
+        })
+
+    return transactions
+
+
+def _first_data_offset(buffer):
+    """
+    Returns the offset of the first line after the header.
+    """
+    newline = buffer.find(b'\n')
+    return len(buffer) if newline == -1 else newline + 1
+
+
+def _parse_file_range(filename, start, end, columns, lazy=False):
+    """
+    Worker entry point: maps the file and parses one byte range of it.
+
+    Every worker maps the same file, so all of them read from the shared
+    OS page cache instead of receiving a pickled copy of the data.
+    """
+    with open(filename, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _parse_buffer_range(buffer, start, end, columns, lazy)
+
+
+def _needs_stream_reader(filename):
+    """
+    Returns True for inputs that cannot be memory-mapped as one file
+    (compressed files, directories and glob patterns)
+    """
+    return filename.endswith(COMPRESSED_EXTENSIONS) or _is_multi_path(filename)
+
+
+def _read_transactions_streamed(filename, columns):
+    """
+    Reads through read_sales_data (streaming decompression, several files
+    in parallel) and parses the lines
+    """
+
+    transactions = parse_transactions(read_sales_data(filename))
+
+    if columns is None or set(columns) >= set(TRANSACTION_FIELDS):
+        return transactions
+
+    return [
+        {name: tx[name] for name in TRANSACTION_FIELDS if name in columns}
+        for tx in transactions
+    ]
+
+
+def read_transactions_mmap(filename, columns=None, lazy=False):
+    """
+    Reads and parses a sales file through a memory map.
+
+    Produces the same records as parse_transactions(read_sales_data(filename))
+    without decoding the whole file into Python strings first.
+
+    Parameters:
+        filename (str): Path to the sales data file
+        columns (list): Optional subset of TRANSACTION_FIELDS to decode
+                        (default: all columns)
+        lazy (bool): Return LazyTransaction records, whose text columns
+                     are decoded from the mapped bytes only when first read
+                     (plain files with all columns only)
+
+    Returns:
+        list: List of Transaction records (plain dictionaries when only
+              some columns are requested)
+    """
+
+    # Compressed files, directories and globs are streamed instead
+    if _needs_stream_reader(filename):
+        return _read_transactions_streamed(filename, columns)
+
+    columns = set(columns or TRANSACTION_FIELDS)
+
+    try:
+        with open(filename, 'rb') as file:
+            # mmap cannot map an empty file
+            if os.fstat(file.fileno()).st_size == 0:
+                return []
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                start = _first_data_offset(buffer)
+                return _parse_buffer_range(buffer, start, len(buffer), columns, lazy)
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return []
+
+
+def read_transactions_parallel(filename, columns=None, workers=None, lazy=False):
+    """
+    Parses a large sales file with several worker processes.
+
+    The file is split into byte ranges that end on line boundaries. Each
+    worker maps the file itself and parses only its own range, so the data
+    is never copied through the parent process before parsing.
+
+    Parameters:
+        filename (str): Path to the sales data file
+        columns (list): Optional subset of TRANSACTION_FIELDS to decode
+        workers (int): Number of worker processes (default: CPU count)
+        lazy (bool): Return LazyTransaction records (see
+                     read_transactions_mmap); workers send them back as raw
+                     lines, so no text column is decoded before it is used
+
+    Returns:
+        list: List of transaction records in file order
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    # Compressed files, directories and globs are streamed instead
+    if _needs_stream_reader(filename):
+        return _read_transactions_streamed(filename, columns)
+
+    try:
+        file_size = os.path.getsize(filename)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return []
+
+    # Small files are not worth the process start-up cost
+    if workers <= 1 or file_size < PARALLEL_MIN_BYTES:
+        return read_transactions_mmap(filename, columns, lazy)
+
+    # Imported here: concurrent.futures pulls in multiprocessing and logging,
+    # which small files never need
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    columns = set(columns or TRANSACTION_FIELDS)
+
+    # Step 1: Split the file into ranges aligned to line boundaries
+    with open(filename, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            start = _first_data_offset(buffer)
+            chunk_size = max(1, (file_size - start) // workers)
+
+            boundaries = [start]
+            while boundaries[-1] < file_size:
+                target = boundaries[-1] + chunk_size
+                if target >= file_size:
+                    boundaries.append(file_size)
+                    break
+                newline = buffer.find(b'\n', target)
+                boundaries.append(file_size if newline == -1 else newline + 1)
+
+    ranges = list(zip(boundaries[:-1], boundaries[1:]))
+
+    # Step 2: Parse each range in its own process. Workers are not forked
+    # from this process: the caller may have other threads running (e.g. the
+    # product API fetch of main_async), and a fork copies any lock those
+    # threads hold, which can deadlock the child
+    start_method = 'spawn'
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        start_method = 'forkserver'
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context(start_method)) as executor:
+        futures = [
+            executor.submit(_parse_file_range, filename, range_start, range_end, columns, lazy)
+            for range_start, range_end in ranges
+        ]
+
+        # Step 3: Concatenate results in file order
+        transactions = []
+        for future in futures:
+            transactions.extend(future.result())
+
+    return transactions
+
+
+#-----External Sort and Streaming Reads-----
+
+# Approximate per-line memory overhead (bytes object, list slot, key)
+# counted against the sort memory budget
+_LINE_OVERHEAD = 100
+
+# Lines parsed at a time by iter_transactions
+STREAM_BATCH_LINES = 10000
+
+
+def _header_columns(header):
+    """
+    Returns: list of the column names in a raw (bytes) header line
+    """
+    text = header.decode('utf-8', errors='replace').lstrip('\ufeff')
+    return [column.strip() for column in text.rstrip('\r\n').split('|')]
+
+
+def _line_sort_key(fields, header):
+    """
+    Returns a function extracting the sort key of a raw (bytes) line
+
+    Column positions and the expected column count are taken from the
+    header, so enriched files sort like plain sales files. Malformed lines
+    get an empty key and end up first; they are dropped later by the
+    parser like in any other file.
+
+    Raises:
+        ValueError: If a sort column is not in the header
+    """
+
+    if isinstance(fields, str):
+        fields = [fields]
+
+    columns = _header_columns(header)
+    for field in fields:
+        if field not in columns:
+            raise ValueError(f"cannot sort by {field!r}: the file has columns {columns}")
+
+    indexes = [columns.index(field) for field in fields]
+    width = len(columns)
+
+    def key(line):
+        parts = line.split(b'|')
+        if len(parts) != width:
+            return (b'',) * len(indexes)
+        return tuple(parts[index].strip() for index in indexes)
+
+    return key
+
+
+def _iter_raw_lines(filename):
+    """
+    Yields ('header', line) for the first line of a plain or compressed
+    file, then ('row', line) for every non-empty data line; lines are bytes
+    and always end in a newline
+    """
+
+    with _open_stream(filename, 'rb') as file:
+        header = file.readline()
+        if header:
+            yield 'header', header if header.endswith(b'\n') else header + b'\n'
+
+        for line in file:
+            if not line.strip():
+                continue
+            if not line.endswith(b'\n'):
+                line += b'\n'
+            yield 'row', line
+
+
+def sort_sales_file(filename, output_file, by='Date', memory_limit=64 * 1024 * 1024,
+                    temp_dir=None):
+    """
+    Sorts a sales file by one or more columns within a memory budget.
+
+    Lines are buffered until `memory_limit` is reached, each buffer is
+    sorted and written to a temporary run file, and the runs are then
+    merged into output_file (external merge sort). The sort is stable:
+    rows with equal keys keep their input order, exactly like sorted().
+    Keys are compared as raw bytes, which matches text order for the
+    ASCII dates and IDs of the sales files.
+
+    Parameters:
+        filename (str): Sales file (plain or compressed), directory or glob;
+                        enriched files can be sorted too
+        output_file (str): Path of the sorted (plain text) file
+        by (str or list): Column name(s) from the header line, e.g.
+                          'Date' or ['CustomerID', 'Date']
+        memory_limit (int): Approximate bytes of lines held in memory
+        temp_dir (str): Directory for run files (default: system temp)
+
+    Returns:
+        int: Number of data lines written
+
+    Raises:
+        FileNotFoundError: If an input file does not exist
+        ValueError: If a sort column is missing, or the input files do not
+                    all have the same columns
+    """
+
+    import heapq
+    import shutil
+    import tempfile
+
+    key = None
+    filenames = expand_sales_paths(filename) if _is_multi_path(filename) else [filename]
+
+    work_dir = tempfile.mkdtemp(prefix='sales_sort_', dir=temp_dir)
+
+    try:
+        header = None
+        run_paths = []
+        buffer = []
+        buffered_bytes = 0
+
+        # Step 1: Sorted runs of at most memory_limit bytes each
+        for name in filenames:
+            for kind, line in _iter_raw_lines(name):
+                if kind == 'header':
+                    # Every input file has a header; keep the first one
+                    if header is None:
+                        header = line
+                        key = _line_sort_key(by, header)
+                    elif _header_columns(line) != _header_columns(header):
+                        raise ValueError(f"{name} does not have the columns of the "
+                                         f"first input file")
+                    continue
+
+                buffer.append(line)
+                buffered_bytes += len(line) + _LINE_OVERHEAD
+
+                if buffered_bytes >= memory_limit:
+                    buffer.sort(key=key)
+                    run_path = os.path.join(work_dir, f"run_{len(run_paths)}.txt")
+                    with open(run_path, 'wb') as run:
+                        run.writelines(buffer)
+                    run_paths.append(run_path)
+                    buffer = []
+                    buffered_bytes = 0
+
+        buffer.sort(key=key)
+
+        # Step 2: Merge the runs (heapq.merge keeps equal keys in run order,
+        # and the in-memory remainder is the last run)
+        output_dir = os.path.dirname(output_file) or "."
+        os.makedirs(output_dir, exist_ok=True)
+        temp_file = f"{output_file}.{os.getpid()}.tmp"
+
+        runs = [open(path, 'rb') for path in run_paths]
+        try:
+            with open(temp_file, 'wb') as output:
+                if header is not None:
+                    output.write(header)
+
+                count = 0
+                for line in heapq.merge(*runs, buffer, key=key):
+                    output.write(line)
+                    count += 1
+        finally:
+            for run in runs:
+                run.close()
+
+        os.replace(temp_file, output_file)
+
+        return count
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def iter_transactions(filename, batch_size=STREAM_BATCH_LINES, lazy=False):
+    """
+    Yields the parsed transactions of a sales file one by one.
+
+    Unlike read_sales_data and parse_transactions, the file is never held
+    in memory as a whole, so a file produced by sort_sales_file can be fed
+    to the streaming (pre-sorted) analytics. Rows are parsed exactly like
+    read_transactions_mmap does.
+
+    Parameters:
+        filename (str): Plain or compressed sales file
+        batch_size (int): Lines parsed at a time
+        lazy (bool): Yield LazyTransaction records, so consumers that read
+                     only one or two text columns decode nothing else
+
+    Yields:
+        Transaction records in file order
+    """
+
+    columns = set(TRANSACTION_FIELDS)
+    batch = []
+
+    for kind, line in _iter_raw_lines(filename):
+        if kind == 'header':
+            continue
+
+        batch.append(line)
+        if len(batch) >= batch_size:
+            chunk = b''.join(batch)
+            yield from _parse_buffer_range(chunk, 0, len(chunk), columns, lazy)
+            batch = []
+
+    if batch:
+        chunk = b''.join(batch)
+        yield from _parse_buffer_range(chunk, 0, len(chunk), columns, lazy)
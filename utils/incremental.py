@@ -0,0 +1,175 @@
+#----------Incremental Sales Aggregates----------
+
+# Running totals that can be updated one transaction at a time. They hold
+# exactly what the data_processor functions compute, so a long-running
+# process can keep its report current without re-scanning old rows.
+# Amounts are kept in integer paise, like in data_processor.
+
+from utils.anomaly import new_detector, observe_transaction, detect_anomalies
+from utils.money import amount_paise, to_rupees
+
+
+def new_aggregates():
+    """
+    Creates an empty set of running totals
+
+    Returns: dictionary of aggregates
+    """
+
+    return {
+        'total_revenue': 0,
+        'transaction_count': 0,
+        'start_date': None,
+        'end_date': None,
+        'regions': {},
+        'products': {},
+        'customers': {},
+        'daily': {},
+        'anomalies': new_detector()
+    }
+
+
+def add_transaction(aggregates, tx):
+    """
+    Adds one valid transaction to the running totals
+    """
+
+    amount = amount_paise(tx)
+    date = tx['Date']
+    region = tx['Region']
+    product = tx['ProductName']
+    customer_id = tx['CustomerID']
+
+    # Overall totals and date range
+    aggregates['total_revenue'] += amount
+    aggregates['transaction_count'] += 1
+
+    if aggregates['start_date'] is None or date < aggregates['start_date']:
+        aggregates['start_date'] = date
+    if aggregates['end_date'] is None or date > aggregates['end_date']:
+        aggregates['end_date'] = date
+
+    # Per region
+    if region not in aggregates['regions']:
+        aggregates['regions'][region] = {
+            'total_sales': 0,
+            'transaction_count': 0
+        }
+    aggregates['regions'][region]['total_sales'] += amount
+    aggregates['regions'][region]['transaction_count'] += 1
+
+    # Per product
+    if product not in aggregates['products']:
+        aggregates['products'][product] = {
+            'total_quantity': 0,
+            'total_revenue': 0
+        }
+    aggregates['products'][product]['total_quantity'] += tx['Quantity']
+    aggregates['products'][product]['total_revenue'] += amount
+
+    # Per customer
+    if customer_id not in aggregates['customers']:
+        aggregates['customers'][customer_id] = {
+            'total_spent': 0,
+            'purchase_count': 0,
+            'products_bought': set()
+        }
+    aggregates['customers'][customer_id]['total_spent'] += amount
+    aggregates['customers'][customer_id]['purchase_count'] += 1
+    aggregates['customers'][customer_id]['products_bought'].add(product)
+
+    # Per day
+    if date not in aggregates['daily']:
+        aggregates['daily'][date] = {
+            'revenue': 0,
+            'transaction_count': 0,
+            'unique_customers': set()
+        }
+    aggregates['daily'][date]['revenue'] += amount
+    aggregates['daily'][date]['transaction_count'] += 1
+    aggregates['daily'][date]['unique_customers'].add(customer_id)
+
+    # Daily revenue series for anomaly detection
+    observe_transaction(aggregates['anomalies'], tx)
+
+
+def analytics_from_aggregates(aggregates, top_n=5, low_threshold=10, open_days=True):
+    """
+    Builds report analytics from the running totals
+
+    The result has the same structure and values as
+    report_generator.build_report_analytics on the same transactions.
+    With open_days=False the anomalies only cover days already closed with
+    anomaly.close_days: a day still filling up would look like a drop.
+
+    Returns: dictionary of analytics results
+    """
+
+    overall_total = aggregates['total_revenue']
+
+    # Region-wise sales (sorted by total sales, descending)
+    region_stats = {}
+    for region, stats in aggregates['regions'].items():
+        region_stats[region] = {
+            'total_sales': to_rupees(stats['total_sales']),
+            'transaction_count': stats['transaction_count'],
+            'percentage': round((stats['total_sales'] / overall_total) * 100, 2)
+        }
+    region_stats = dict(
+        sorted(region_stats.items(), key=lambda item: item[1]['total_sales'], reverse=True)
+    )
+
+    # Top and low performing products
+    product_list = [
+        (product, data['total_quantity'], to_rupees(data['total_revenue']))
+        for product, data in aggregates['products'].items()
+    ]
+    top_products = sorted(product_list, key=lambda x: x[1], reverse=True)[:top_n]
+    low_products = sorted(
+        [item for item in product_list if item[1] < low_threshold],
+        key=lambda x: x[1]
+    )
+
+    # Customers (sorted by total spent, descending)
+    customers = {}
+    for customer_id, data in aggregates['customers'].items():
+        total_spent = to_rupees(data['total_spent'])
+        customers[customer_id] = {
+            'total_spent': total_spent,
+            'purchase_count': data['purchase_count'],
+            'products_bought': list(data['products_bought']),
+            'avg_order_value': round(total_spent / data['purchase_count'], 2)
+        }
+    customers = dict(
+        sorted(customers.items(), key=lambda item: item[1]['total_spent'], reverse=True)
+    )
+
+    # Daily trend (sorted by date) and peak day
+    daily_trend = {}
+    for date, data in sorted(aggregates['daily'].items()):
+        daily_trend[date] = {
+            'revenue': to_rupees(data['revenue']),
+            'transaction_count': data['transaction_count'],
+            'unique_customers': len(data['unique_customers'])
+        }
+
+    peak_date, peak_stats = max(
+        aggregates['daily'].items(),
+        key=lambda item: item[1]['revenue']
+    )
+
+    return {
+        'total_revenue': to_rupees(overall_total),
+        'total_transactions': aggregates['transaction_count'],
+        'start_date': aggregates['start_date'],
+        'end_date': aggregates['end_date'],
+        'region_stats': region_stats,
+        'top_products': top_products,
+        'customers': customers,
+        'daily_trend': daily_trend,
+        'peak_day': (peak_date, to_rupees(peak_stats['revenue']),
+                     peak_stats['transaction_count']),
+        'low_products': low_products,
+        'anomalies': (detect_anomalies(aggregates['anomalies']) if open_days
+                      else list(aggregates['anomalies']['anomalies']))
+    }
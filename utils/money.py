@@ -0,0 +1,104 @@
+#----------Exact Money Arithmetic----------
+
+# Amounts are handled as integer paise (1 rupee = 100 paise). Integer sums
+# are exact, so totals do not drift on large files and do not depend on the
+# order in which rows (or shards of rows) are added up. Values are turned
+# back into rupees only when results are returned for display.
+
+import math
+
+
+def parse_paise(text):
+    """
+    Parses a price such as '1,916', '19.99' or b'173' into integer paise.
+
+    Values with more than two decimals are rounded half-up to the nearest
+    paisa.
+
+    Parameters:
+        text (str or bytes): Price text (commas allowed)
+
+    Returns:
+        int: Amount in paise
+
+    Raises:
+        ValueError: If the text is not a finite number
+    """
+
+    if isinstance(text, bytes):
+        # Non-ASCII bytes raise UnicodeDecodeError, a ValueError
+        text = text.decode('ascii')
+
+    text = text.replace(',', '').strip()
+
+    # Fast path: plain [sign]digits[.d[d]]
+    sign = -1 if text[:1] == '-' else 1
+    body = text[1:] if text[:1] in ('-', '+') else text
+    whole, dot, fraction = body.partition('.')
+
+    if (whole.isdigit() or (not whole and fraction)) \
+            and (not fraction or fraction.isdigit()) and len(fraction) <= 2:
+        return sign * (int(whole or '0') * 100 + int(fraction.ljust(2, '0')))
+
+    # Anything else (exponents, extra decimals) goes through Decimal
+    from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"could not convert string to money: {text!r}")
+
+    if not value.is_finite():
+        raise ValueError(f"could not convert string to money: {text!r}")
+
+    try:
+        # Fails for values with more digits than the decimal precision
+        return int(value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP) * 100)
+    except InvalidOperation:
+        raise ValueError(f"money value out of range: {text!r}")
+
+
+def to_paise(amount):
+    """
+    Converts a rupee amount (int or float) to integer paise
+
+    Raises:
+        ValueError: If the amount is infinite or NaN
+    """
+
+    if not math.isfinite(amount):
+        raise ValueError(f"amount must be a finite number, got {amount!r}")
+
+    return int(round(amount * 100))
+
+
+def to_rupees(paise):
+    """
+    Converts integer paise to rupees for display
+
+    A single division of an exact integer always gives the same float, no
+    matter how the integer was summed.
+    """
+    return paise / 100
+
+
+def price_paise(tx):
+    """
+    Returns the unit price of a transaction in paise
+
+    Parsed Transaction records carry the exact price; plain dictionaries
+    (e.g. enriched copies) are converted from their UnitPrice.
+    """
+
+    paise = getattr(tx, 'price_paise', None)
+    if paise is None:
+        paise = to_paise(tx['UnitPrice'])
+
+    return paise
+
+
+def amount_paise(tx):
+    """
+    Returns Quantity * UnitPrice of a transaction in paise
+    """
+    return tx['Quantity'] * price_paise(tx)
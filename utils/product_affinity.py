@@ -0,0 +1,146 @@
+#----------Product Affinity (Market-Basket) Analytics----------
+
+# Finds products that are bought together.
+#
+# A basket is the set of products of one customer (by='customer') or of one
+# customer on one day (by='day'). Pairs are counted in two passes, as in
+# Apriori: products below the minimum support are dropped first, so only
+# pairs of frequent products are ever counted. Products are numbered
+# 0..n-1 and a pair (i, j) with i < j is stored under the single integer
+# i * n + j, which keeps the pair table a flat dict of ints instead of a
+# nested products x products structure.
+
+import math
+from array import array
+
+from utils.cache import memoize_analysis
+
+# Basket definitions: function(transaction) -> basket key
+BASKET_KEYS = {
+    'customer': lambda tx: tx['CustomerID'],
+    'day': lambda tx: (tx['CustomerID'], tx['Date'])
+}
+
+
+def build_baskets(transactions, by='customer'):
+    """
+    Groups products into baskets
+
+    Parameters:
+        transactions (list): Valid transactions
+        by (str): 'customer' or 'day' (one basket per customer and date)
+
+    Returns: tuple (baskets, product_names) where baskets is a list of
+             sorted tuples of product numbers and product_names maps a
+             number back to its ProductName
+    """
+
+    if by not in BASKET_KEYS:
+        raise ValueError(f"by must be one of {sorted(BASKET_KEYS)}, got {by!r}")
+
+    basket_key = BASKET_KEYS[by]
+    product_numbers = {}
+    baskets = {}
+
+    for tx in transactions:
+        product = tx['ProductName']
+
+        number = product_numbers.get(product)
+        if number is None:
+            number = product_numbers[product] = len(product_numbers)
+
+        key = basket_key(tx)
+        basket = baskets.get(key)
+        if basket is None:
+            basket = baskets[key] = set()
+        basket.add(number)
+
+    return [tuple(sorted(basket)) for basket in baskets.values()], list(product_numbers)
+
+
+@memoize_analysis
+def product_affinity(transactions, by='customer', min_support=0.01, n=10):
+    """
+    Finds the most strongly associated product pairs
+
+    Parameters:
+        transactions (list): Valid transactions
+        by (str): Basket definition, 'customer' or 'day'
+        min_support (float): Minimum share of baskets (0-1) that must
+                             contain a product, and a pair, for it to be kept
+        n (int): Number of pairs to return (None for all)
+
+    Returns: dictionary with basket/product counts and 'pairs', a list of
+             pair statistics sorted by lift, then support (descending):
+             product_a, product_b, baskets, support,
+             confidence_a_to_b, confidence_b_to_a, lift
+    """
+
+    baskets, product_names = build_baskets(transactions, by)
+
+    basket_count = len(baskets)
+    product_count = len(product_names)
+
+    result = {
+        'basket_type': by,
+        'baskets': basket_count,
+        'products': product_count,
+        'frequent_products': 0,
+        'pair_candidates': 0,
+        'pairs': []
+    }
+
+    if not basket_count:
+        return result
+
+    # Pair and product counts below this are pruned
+    min_count = max(1, math.ceil(min_support * basket_count))
+
+    # Step 1: Number of baskets containing each product
+    product_baskets = array('q', bytes(8 * product_count))
+    for basket in baskets:
+        for number in basket:
+            product_baskets[number] += 1
+
+    frequent = [count >= min_count for count in product_baskets]
+    result['frequent_products'] = sum(frequent)
+
+    # Step 2: Count pairs of frequent products under packed integer keys
+    pair_counts = {}
+    for basket in baskets:
+        items = [number for number in basket if frequent[number]]
+
+        for i, first in enumerate(items):
+            base = first * product_count
+            for second in items[i + 1:]:
+                key = base + second
+                pair_counts[key] = pair_counts.get(key, 0) + 1
+
+    result['pair_candidates'] = len(pair_counts)
+
+    # Step 3: Support, confidence and lift of the pairs that pass
+    pairs = []
+    for key, count in pair_counts.items():
+        if count < min_count:
+            continue
+
+        first, second = divmod(key, product_count)
+        first_count = product_baskets[first]
+        second_count = product_baskets[second]
+
+        pairs.append({
+            'product_a': product_names[first],
+            'product_b': product_names[second],
+            'baskets': count,
+            'support': round(count / basket_count, 4),
+            'confidence_a_to_b': round(count / first_count, 4),
+            'confidence_b_to_a': round(count / second_count, 4),
+            'lift': round(count * basket_count / (first_count * second_count), 4)
+        })
+
+    pairs.sort(key=lambda pair: (-pair['lift'], -pair['baskets'],
+                                 pair['product_a'], pair['product_b']))
+
+    result['pairs'] = pairs[:n] if n is not None else pairs
+
+    return result
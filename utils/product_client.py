@@ -0,0 +1,285 @@
+#----------Resilient Product API Client----------
+
+import json
+import os
+import random
+import threading
+import time
+
+PRODUCTS_URL = "https://dummyjson.com/products?limit=100"
+
+# (connect, read) timeouts in seconds; a stuck socket can no longer hang a run
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+
+# Bounded retries with exponential backoff and full jitter
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 5.0
+
+# No retry is started after this many seconds since the first attempt
+TOTAL_DEADLINE = 30.0
+
+# Circuit breaker: after this many failed fetches in a row the API is not
+# called again for RESET_TIMEOUT seconds; then one trial request is allowed
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 60.0
+
+# Last good catalog, used whenever the API is unavailable
+FALLBACK_CATALOG = "data/product_catalog.json"
+
+# A successful result is shared with callers arriving within this window
+# instead of issuing another request
+SHARE_WINDOW = 30.0
+
+
+_breaker = {
+    'state': 'closed',
+    'consecutive_failures': 0,
+    'opened_at': None
+}
+
+_metrics = {
+    'api_requests': 0,
+    'api_failures': 0,
+    'retries': 0,
+    'breaker_rejections': 0,
+    'fallback_used': 0,
+    'last_source': None,
+    'last_error': None,
+    'last_fetch_ms': None,
+    'enrichment_runs': 0,
+    'last_enrichment_ms': None,
+    'last_enrichment_total': 0,
+    'last_enrichment_matched': 0
+}
+
+_last_success = {
+    'products': None,
+    'at': None
+}
+
+# Only one fetch is in flight at a time; concurrent callers wait for it
+# and share its result instead of piling more requests onto a slow API
+_fetch_lock = threading.Lock()
+
+
+# ---------------- CIRCUIT BREAKER ----------------
+
+def _breaker_allows_request():
+    """
+    Returns True if the API may be called now
+    """
+
+    if _breaker['state'] == 'open':
+        if time.monotonic() - _breaker['opened_at'] < RESET_TIMEOUT:
+            return False
+        # Cool-down is over: let one trial request through
+        _breaker['state'] = 'half-open'
+
+    return True
+
+
+def _record_success():
+    _breaker['state'] = 'closed'
+    _breaker['consecutive_failures'] = 0
+    _breaker['opened_at'] = None
+
+
+def _record_failure():
+    _breaker['consecutive_failures'] += 1
+
+    if _breaker['state'] == 'half-open' or _breaker['consecutive_failures'] >= FAILURE_THRESHOLD:
+        _breaker['state'] = 'open'
+        _breaker['opened_at'] = time.monotonic()
+
+
+def reset_client():
+    """
+    Closes the circuit breaker and clears shared results and metrics
+    """
+
+    _record_success()
+    _last_success['products'] = None
+    _last_success['at'] = None
+
+    for key in _metrics:
+        _metrics[key] = 0 if isinstance(_metrics[key], int) else None
+
+
+# ---------------- FALLBACK CATALOG ----------------
+
+def save_fallback_catalog(products, filename=FALLBACK_CATALOG):
+    """
+    Stores the catalog atomically so a later run can fall back to it
+    """
+
+    directory = os.path.dirname(filename) or "."
+    temp_file = f"{filename}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump({"saved_at": time.time(), "products": products}, file)
+        os.replace(temp_file, filename)
+    except OSError as e:
+        print("Could not save fallback product catalog:", e)
+
+
+def load_fallback_catalog(filename=FALLBACK_CATALOG):
+    """
+    Returns: list of products from the fallback catalog ([] if unavailable)
+    """
+
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            return json.load(file).get("products", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+
+
+# ---------------- FETCH ----------------
+
+def _backoff_delay(attempt):
+    """
+    Full-jitter exponential backoff for the given retry number (1, 2, ...)
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _request_products(url, timeout):
+    import requests
+
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+
+    data = response.json()
+    products = data.get("products") if isinstance(data, dict) else None
+    if not isinstance(products, list):
+        raise ValueError("response has no product list")
+
+    return products
+
+
+def fetch_products(url=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                   max_attempts=MAX_ATTEMPTS, fallback_file=FALLBACK_CATALOG):
+    """
+    Fetches the product catalog with timeouts, retries, a circuit breaker
+    and a local fallback
+
+    Parameters:
+        url (str): Catalog endpoint (default: PRODUCTS_URL)
+        timeout (tuple): (connect, read) timeouts in seconds
+        max_attempts (int): Attempts per fetch (including the first)
+        fallback_file (str): Catalog file written on success and read when
+                             the API cannot be used (None to disable)
+
+    Returns: tuple (products, source) where source is 'api', 'fallback'
+             or 'none'
+    """
+
+    # Imported here so that offline runs never load the HTTP stack
+    import requests
+
+    if url is None:
+        url = PRODUCTS_URL
+
+    with _fetch_lock:
+        # A caller that waited for another fetch reuses its fresh result
+        if _last_success['at'] is not None and time.monotonic() - _last_success['at'] < SHARE_WINDOW:
+            return _last_success['products'], 'api'
+
+        started = time.monotonic()
+
+        if _breaker_allows_request():
+            # A half-open breaker gets a single trial request
+            attempts = 1 if _breaker['state'] == 'half-open' else max_attempts
+
+            for attempt in range(1, attempts + 1):
+                _metrics['api_requests'] += 1
+
+                try:
+                    products = _request_products(url, timeout)
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    _metrics['api_failures'] += 1
+                    _metrics['last_error'] = str(e)
+
+                    delay = _backoff_delay(attempt)
+                    if attempt == attempts or time.monotonic() - started + delay > TOTAL_DEADLINE:
+                        break
+
+                    _metrics['retries'] += 1
+                    time.sleep(delay)
+                    continue
+
+                _record_success()
+                _last_success['products'] = products
+                _last_success['at'] = time.monotonic()
+                _metrics['last_fetch_ms'] = (time.monotonic() - started) * 1000
+                _metrics['last_source'] = 'api'
+
+                if fallback_file:
+                    save_fallback_catalog(products, fallback_file)
+
+                return products, 'api'
+
+            _record_failure()
+        else:
+            _metrics['breaker_rejections'] += 1
+            _metrics['last_error'] = "circuit breaker open"
+
+        # API unavailable: use the last good catalog if there is one
+        products = load_fallback_catalog(fallback_file) if fallback_file else []
+        source = 'fallback' if products else 'none'
+
+        if products:
+            _metrics['fallback_used'] += 1
+
+        _metrics['last_fetch_ms'] = (time.monotonic() - started) * 1000
+        _metrics['last_source'] = source
+
+        return products, source
+
+
+# ---------------- METRICS ----------------
+
+def record_enrichment(duration_seconds, total, matched):
+    """
+    Records the latency and match count of one enrichment run
+    """
+    _metrics['enrichment_runs'] += 1
+    _metrics['last_enrichment_ms'] = duration_seconds * 1000
+    _metrics['last_enrichment_total'] = total
+    _metrics['last_enrichment_matched'] = matched
+
+
+def get_client_metrics():
+    """
+    Returns: dictionary of fetch and enrichment metrics, including the
+             current circuit breaker state
+    """
+    return dict(
+        _metrics,
+        breaker_state=_breaker['state'],
+        consecutive_failures=_breaker['consecutive_failures']
+    )
+
+
+def format_client_metrics():
+    """
+    Returns: one-line summary of the metrics for console output
+    """
+
+    metrics = get_client_metrics()
+
+    parts = [f"source={metrics['last_source']}"]
+    if metrics['last_fetch_ms'] is not None:
+        parts.append(f"fetch={metrics['last_fetch_ms']:.0f}ms")
+    parts.append(f"requests={metrics['api_requests']}")
+    parts.append(f"failures={metrics['api_failures']}")
+    parts.append(f"retries={metrics['retries']}")
+    parts.append(f"breaker={metrics['breaker_state']}")
+    if metrics['last_enrichment_ms'] is not None:
+        parts.append(f"enrichment={metrics['last_enrichment_ms']:.1f}ms")
+
+    return " ".join(parts)
@@ -0,0 +1,251 @@
+#----------Local HTTP Query Service----------
+
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from utils.file_handler import read_transactions_parallel, validate_and_filter
+from utils.data_processor import (
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+from utils.product_affinity import product_affinity
+from utils.anomaly import find_sales_anomalies
+from utils.sales_cube import build_cube, cube_query
+
+# Number of encoded responses kept per server
+RESPONSE_CACHE_SIZE = 256
+
+# Number of filtered datasets (one per region/amount combination) kept
+FILTER_CACHE_SIZE = 32
+
+
+def _summary(transactions):
+    dates = [tx['Date'] for tx in transactions]
+    return {
+        'total_revenue': calculate_total_revenue(transactions),
+        'total_transactions': len(transactions),
+        'start_date': min(dates) if dates else None,
+        'end_date': max(dates) if dates else None
+    }
+
+
+def _peak_day(transactions):
+    if not transactions:
+        return None
+
+    date, revenue, count = find_peak_sales_day(transactions)
+    return {'date': date, 'revenue': revenue, 'transaction_count': count}
+
+
+def _products(rows):
+    return [
+        {'product': name, 'total_quantity': qty, 'total_revenue': revenue}
+        for name, qty, revenue in rows
+    ]
+
+
+# Each view: function(transactions, params) -> JSON-serializable result
+VIEWS = {
+    '/summary': lambda data, params: _summary(data),
+    '/regions': lambda data, params: region_wise_sales(data),
+    '/top-products': lambda data, params: _products(
+        top_selling_products(data, _int_param(params, 'n', 5))
+    ),
+    '/customers': lambda data, params: dict(
+        list(customer_analysis(data).items())[:_int_param(params, 'limit', None)]
+    ),
+    '/daily': lambda data, params: daily_sales_trend(data),
+    '/peak-day': lambda data, params: _peak_day(data),
+    '/low-products': lambda data, params: _products(
+        low_performing_products(data, _int_param(params, 'threshold', 10))
+    ),
+    '/cube': lambda data, params: cube_query(
+        build_cube(data),
+        _list_param(params, 'group_by') or (),
+        _list_param(params, 'region'),
+        _list_param(params, 'product'),
+        params.get('start_date') or None,
+        params.get('end_date') or None
+    ),
+    '/anomalies': lambda data, params: find_sales_anomalies(data),
+    '/affinity': lambda data, params: product_affinity(
+        data,
+        params.get('by', 'customer'),
+        _float_param(params, 'min_support', 0.01),
+        _int_param(params, 'n', 10)
+    )
+}
+
+
+def _int_param(params, name, default):
+    if name not in params:
+        return default
+    return int(params[name])
+
+
+def _list_param(params, name):
+    if name not in params or params[name] == '':
+        return None
+    return tuple(value.strip() for value in params[name].split(','))
+
+
+def _float_param(params, name, default=None):
+    if name not in params or params[name] == '':
+        return default
+    return float(params[name])
+
+
+class QueryServer(ThreadingHTTPServer):
+    """
+    HTTP server holding the parsed sales data and its query caches
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, parsed_transactions):
+        super().__init__(address, QueryHandler)
+
+        self.parsed_transactions = parsed_transactions
+        self.filtered = OrderedDict()
+        self.responses = OrderedDict()
+
+        # The analytics cache is not thread-safe, so cache misses are
+        # computed one at a time; cache hits only hold the lock for a lookup
+        self.lock = threading.Lock()
+
+    def dataset(self, region=None, min_amount=None, max_amount=None):
+        """
+        Returns the validated (and optionally filtered) dataset
+
+        The same list object is returned for the same filters, so the
+        memoized analytics stay valid between queries.
+        """
+
+        key = (region, min_amount, max_amount)
+        if key in self.filtered:
+            self.filtered.move_to_end(key)
+            return self.filtered[key]
+
+        valid_data, invalid_count, summary = validate_and_filter(
+            self.parsed_transactions,
+            region=region,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            verbose=False
+        )
+
+        self.filtered[key] = valid_data
+        while len(self.filtered) > FILTER_CACHE_SIZE:
+            self.filtered.popitem(last=False)
+
+        return valid_data
+
+    def query(self, path, params):
+        """
+        Answers one query
+
+        Returns: tuple (HTTP status, encoded JSON body)
+        """
+
+        cache_key = (path, tuple(sorted(params.items())))
+
+        with self.lock:
+            if cache_key in self.responses:
+                self.responses.move_to_end(cache_key)
+                return self.responses[cache_key]
+
+            try:
+                if path == '/filter':
+                    # Filtered view: region/amount filters plus any other view
+                    view = '/' + params.get('view', 'summary')
+                    data = self.dataset(
+                        params.get('region') or None,
+                        _float_param(params, 'min_amount'),
+                        _float_param(params, 'max_amount')
+                    )
+                else:
+                    view = path
+                    data = self.dataset()
+
+                if view not in VIEWS:
+                    return 404, _encode({'error': f"Unknown query '{view}'",
+                                         'queries': sorted(VIEWS) + ['/filter']})
+
+                response = (200, _encode(VIEWS[view](data, params)))
+
+            except (ValueError, OverflowError) as e:
+                # Bad parameter (e.g. a non-numeric or infinite amount)
+                return 400, _encode({'error': str(e)})
+
+            except Exception as e:
+                # Keep the connection: report the failure as JSON
+                return 500, _encode({'error': f"{type(e).__name__}: {e}"})
+
+            self.responses[cache_key] = response
+            while len(self.responses) > RESPONSE_CACHE_SIZE:
+                self.responses.popitem(last=False)
+
+            return response
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Maps GET requests to analytics queries
+    """
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        status, body = self.server.query(url.path.rstrip('/') or '/', params)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; dashboards poll frequently
+        pass
+
+
+def _encode(result):
+    return json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+
+def serve_analytics(sales_file='data/sales_data.txt', host='127.0.0.1', port=8000):
+    """
+    Loads the sales data once and serves analytics over local HTTP/JSON
+
+    Queries (GET):
+        /summary, /regions, /top-products?n=5, /customers?limit=10,
+        /daily, /peak-day, /low-products?threshold=10
+        /filter?region=North&min_amount=1000&max_amount=50000&view=regions
+
+    Parameters:
+        sales_file (str): Path to the sales data file
+        host (str): Interface to bind (local only by default)
+        port (int): Port to listen on
+    """
+
+    parsed_transactions = read_transactions_parallel(sales_file)
+    print(f"Loaded {len(parsed_transactions)} records from {sales_file}")
+
+    server = QueryServer((host, port), parsed_transactions)
+    print(f"Serving analytics on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped query service.")
+    finally:
+        server.server_close()
@@ -1,3 +1,4 @@
+import os
 from datetime import datetime
 
 from utils.data_processor import (
@@ -9,40 +10,128 @@ from utils.data_processor import (
     find_peak_sales_day,
     low_performing_products
 )
+from utils.anomaly import find_sales_anomalies
 
+# Number of most recent anomalies listed in the report
+REPORT_ANOMALIES = 10
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+
+def build_report_analytics(transactions, max_groups=None):
+    """
+    Runs every analysis the report needs
+
+    Parameters:
+        transactions (list): Valid transactions
+        max_groups (int): Optional memory limit (number of customers or
+                          products held at once); when given, top customers
+                          and products are computed with spill-to-disk
+                          aggregation
+
+    Returns: dictionary of analytics results used by write_sales_report
+    """
+
+    dates = [tx['Date'] for tx in transactions]
+
+    if max_groups is None:
+        top_products = top_selling_products(transactions, 5)
+        customers = customer_analysis(transactions)
+    else:
+        from utils.external_agg import top_customers_external, top_selling_products_external
+
+        # The report only lists the top 5 of each
+        top_products = top_selling_products_external(transactions, 5, max_groups=max_groups)
+        customers = top_customers_external(transactions, 5, max_groups=max_groups)
+
+    return {
+        'total_revenue': calculate_total_revenue(transactions),
+        'total_transactions': len(transactions),
+        'start_date': min(dates),
+        'end_date': max(dates),
+        'region_stats': region_wise_sales(transactions),
+        'top_products': top_products,
+        'customers': customers,
+        'daily_trend': daily_sales_trend(transactions),
+        'peak_day': find_peak_sales_day(transactions),
+        'low_products': low_performing_products(transactions),
+        'anomalies': find_sales_anomalies(transactions)
+    }
+
+
+def summarize_enrichment(enriched_transactions):
+    """
+    Summarizes API enrichment results
+
+    Returns: dictionary with enriched_count, total and failed_products
+    """
+
+    enriched_success = [tx for tx in enriched_transactions if tx.get('API_Match')]
+    failed_enrichment = [tx['ProductName'] for tx in enriched_transactions if not tx.get('API_Match')]
+
+    return {
+        'enriched_count': len(enriched_success),
+        'total': len(enriched_transactions),
+        'failed_products': failed_enrichment
+    }
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt',
+                          max_groups=None):
     """
     Generates a comprehensive formatted text report
+
+    max_groups bounds the memory used for the customer and product
+    rankings (see build_report_analytics).
+    """
+
+    analytics = build_report_analytics(transactions, max_groups)
+    enrichment = summarize_enrichment(enriched_transactions)
+
+    write_sales_report(analytics, enrichment, output_file)
+
+
+def write_sales_report(analytics, enrichment, output_file='output/sales_report.txt'):
+    """
+    Writes the formatted report from precomputed analytics
+
+    The report is written to a temporary file next to output_file and then
+    renamed over it, so readers never see a half-written report.
+
+    Parameters:
+        analytics (dict): Output of build_report_analytics (or the same
+                          structure built incrementally)
+        enrichment (dict): Output of summarize_enrichment
+        output_file (str): Path of the report
     """
 
     # Ensure output directory exists
-    import os
-    os.makedirs("output", exist_ok=True)
+    output_dir = os.path.dirname(output_file) or "."
+    os.makedirs(output_dir, exist_ok=True)
 
     # ---------------- BASIC METRICS ----------------
-    total_revenue = calculate_total_revenue(transactions)
-    total_transactions = len(transactions)
+    total_revenue = analytics['total_revenue']
+    total_transactions = analytics['total_transactions']
     avg_order_value = total_revenue / total_transactions if total_transactions else 0
 
-    dates = [tx['Date'] for tx in transactions]
-    start_date, end_date = min(dates), max(dates)
+    start_date, end_date = analytics['start_date'], analytics['end_date']
 
     # ---------------- ANALYTICS ----------------
-    region_stats = region_wise_sales(transactions)
-    top_products = top_selling_products(transactions, 5)
-    customers = customer_analysis(transactions)
-    daily_trend = daily_sales_trend(transactions)
-    peak_day = find_peak_sales_day(transactions)
-    low_products = low_performing_products(transactions)
+    region_stats = analytics['region_stats']
+    top_products = analytics['top_products']
+    customers = analytics['customers']
+    daily_trend = analytics['daily_trend']
+    peak_day = analytics['peak_day']
+    low_products = analytics['low_products']
+    anomalies = analytics['anomalies']
 
     # API enrichment stats
-    enriched_success = [tx for tx in enriched_transactions if tx.get('API_Match')]
-    failed_enrichment = [tx['ProductName'] for tx in enriched_transactions if not tx.get('API_Match')]
-    success_rate = (len(enriched_success) / len(enriched_transactions)) * 100 if enriched_transactions else 0
+    enriched_count = enrichment['enriched_count']
+    failed_enrichment = enrichment['failed_products']
+    success_rate = (enriched_count / enrichment['total']) * 100 if enrichment['total'] else 0
 
     # ---------------- WRITE REPORT ----------------
-    with open(output_file, "w", encoding="utf-8") as file:
+    temp_file = f"{output_file}.{os.getpid()}.tmp"
+
+    with open(temp_file, "w", encoding="utf-8") as file:
 
         # HEADER
         file.write("=" * 44 + "\n")
@@ -113,16 +202,44 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
             file.write("No low performing products.\n")
         file.write("\n")
 
+        # SALES ANOMALIES
+        file.write("SALES ANOMALIES\n")
+        file.write("-" * 44 + "\n")
+        if anomalies:
+            recent = anomalies[-REPORT_ANOMALIES:]
+            file.write(f"Unusual days: {len(anomalies)} (latest {len(recent)} shown)\n")
+
+            # Header and rows share one layout; the Series column widens
+            # for long product names so the amounts stay aligned
+            names = [f"{anomaly['dimension']}: {anomaly['name']}" for anomaly in recent]
+            width = max([22] + [len(name) for name in names])
+            row = "{:<10}   {:<6}  {:<%d} {:>15}   {}\n" % width
+
+            file.write(row.format('Date', 'Type', 'Series', 'Revenue', 'Expected'))
+            for anomaly, series in zip(recent, names):
+                file.write(row.format(
+                    anomaly['date'], anomaly['type'], series,
+                    f"₹{anomaly['revenue']:,.2f}", f"₹{anomaly['expected']:,.2f}"
+                ))
+        else:
+            file.write("No anomalies detected.\n")
+        file.write("\n")
+
         # API ENRICHMENT SUMMARY
         file.write("API ENRICHMENT SUMMARY\n")
         file.write("-" * 44 + "\n")
-        file.write(f"Total Records Enriched: {len(enriched_success)}\n")
+        file.write(f"Total Records Enriched: {enriched_count}\n")
         file.write(f"Success Rate: {success_rate:.2f}%\n")
         if failed_enrichment:
             file.write("Products not enriched:\n")
-            for p in set(failed_enrichment):
+            # Unique names in first-seen order (a set would print them in
+            # a different order on every run)
+            for p in dict.fromkeys(failed_enrichment):
                 file.write(f"- {p}\n")
         else:
             file.write("All products enriched successfully.\n")
 
+    # Atomic on POSIX and Windows: the old report stays until the new one is complete
+    os.replace(temp_file, output_file)
+
     print(f"Sales report generated at {output_file}")
@@ -0,0 +1,281 @@
+#----------Sales Cube (Region x Product x Date)----------
+
+# A materialized cube holding sum(quantity), sum(revenue) and the number of
+# transactions for every (Region, ProductID, Date) combination that has
+# sales. Queries roll up, slice and dice these cells instead of the raw
+# rows, so an ad-hoc question such as "top products in North last week"
+# touches only the cells of that week.
+#
+# Layout: each dimension is dictionary-encoded (a sorted list of its values)
+# and the non-empty cells are stored as parallel typed arrays, sorted by
+# date, so a date range maps to one contiguous slice found by binary search.
+
+import bisect
+import json
+import os
+import sys
+from array import array
+
+from utils.cache import memoize_analysis
+from utils.money import amount_paise, to_rupees
+
+DIMENSIONS = ('Region', 'ProductID', 'Date')
+
+# 'Month' rolls the Date dimension up to 'YYYY-MM'
+GROUP_BY_FIELDS = DIMENSIONS + ('Month',)
+
+# Typecodes of the cell columns: dimension indexes and measures
+_INDEX_TYPE = 'I'
+_MEASURE_TYPE = 'q'
+_COLUMNS = (
+    ('region', _INDEX_TYPE), ('product', _INDEX_TYPE), ('date', _INDEX_TYPE),
+    ('quantity', _MEASURE_TYPE), ('revenue', _MEASURE_TYPE), ('count', _MEASURE_TYPE)
+)
+
+_FILE_MAGIC = b"SALESCUBE1\n"
+
+
+@memoize_analysis
+def build_cube(transactions):
+    """
+    Builds the cube from valid transactions in one pass
+
+    Returns: dictionary with the dimension values ('regions', 'products',
+             'dates'), 'product_names' (ProductID -> first ProductName seen)
+             and the cell columns ('region', 'product', 'date', 'quantity',
+             'revenue' in paise, 'count') as typed arrays
+    """
+
+    # Step 1: Aggregate rows into cells keyed by dimension values
+    cells = {}
+    product_names = {}
+
+    for tx in transactions:
+        key = (tx['Date'], tx['Region'], tx['ProductID'])
+
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = [0, 0, 0]
+        cell[0] += tx['Quantity']
+        cell[1] += amount_paise(tx)
+        cell[2] += 1
+
+        if tx['ProductID'] not in product_names:
+            product_names[tx['ProductID']] = tx['ProductName']
+
+    # Step 2: Dictionary-encode the dimensions
+    regions = sorted({key[1] for key in cells})
+    products = sorted(product_names)
+    dates = sorted({key[0] for key in cells})
+
+    region_index = {value: i for i, value in enumerate(regions)}
+    product_index = {value: i for i, value in enumerate(products)}
+    date_index = {value: i for i, value in enumerate(dates)}
+
+    # Step 3: Store the cells as columns sorted by (date, region, product)
+    cube = {
+        'regions': regions,
+        'products': products,
+        'dates': dates,
+        'product_names': product_names
+    }
+    for name, typecode in _COLUMNS:
+        cube[name] = array(typecode)
+
+    for (date, region, product), (quantity, revenue, count) in sorted(cells.items()):
+        cube['region'].append(region_index[region])
+        cube['product'].append(product_index[product])
+        cube['date'].append(date_index[date])
+        cube['quantity'].append(quantity)
+        cube['revenue'].append(revenue)
+        cube['count'].append(count)
+
+    return cube
+
+
+def _selected_indexes(values, selection):
+    """
+    Returns the set of indexes of the selected values, or None for all
+    """
+
+    if selection is None:
+        return None
+    if isinstance(selection, str):
+        selection = [selection]
+
+    positions = {value: i for i, value in enumerate(values)}
+    return {positions[value] for value in selection if value in positions}
+
+
+def _cell_range(cube, start_date, end_date):
+    """
+    Returns the [first, last) cell positions of an inclusive date range
+    """
+
+    dates = cube['dates']
+    first_date = 0 if start_date is None else bisect.bisect_left(dates, start_date)
+    last_date = len(dates) if end_date is None else bisect.bisect_right(dates, end_date)
+
+    # Cells are sorted by date index
+    cell_dates = cube['date']
+    return (bisect.bisect_left(cell_dates, first_date),
+            bisect.bisect_left(cell_dates, last_date))
+
+
+def cube_query(cube, group_by=(), region=None, product=None, start_date=None, end_date=None):
+    """
+    Aggregates the cells matching a slice/dice filter
+
+    Parameters:
+        cube (dict): Output of build_cube (or load_cube)
+        group_by (tuple): Fields to keep, from 'Region', 'ProductID',
+                          'Date' and 'Month'; () rolls everything up
+        region (str or list): Region(s) to keep (default: all)
+        product (str or list): ProductID(s) to keep (default: all)
+        start_date, end_date (str): Inclusive 'YYYY-MM-DD' date range
+
+    Returns: list of dictionaries sorted by the group_by fields, each with
+             those fields plus quantity, revenue and transactions
+    """
+
+    for field in group_by:
+        if field not in GROUP_BY_FIELDS:
+            raise ValueError(f"cannot group by {field!r}; use {', '.join(GROUP_BY_FIELDS)}")
+
+    regions = _selected_indexes(cube['regions'], region)
+    products = _selected_indexes(cube['products'], product)
+    first, last = _cell_range(cube, start_date, end_date)
+
+    cell_region, cell_product, cell_date = cube['region'], cube['product'], cube['date']
+    quantity, revenue, count = cube['quantity'], cube['revenue'], cube['count']
+
+    # Functions turning a cell position into one group_by value
+    key_parts = {
+        'Region': lambda i: cube['regions'][cell_region[i]],
+        'ProductID': lambda i: cube['products'][cell_product[i]],
+        'Date': lambda i: cube['dates'][cell_date[i]],
+        'Month': lambda i: cube['dates'][cell_date[i]][:7]
+    }
+    parts = [key_parts[field] for field in group_by]
+
+    groups = {}
+    for i in range(first, last):
+        if regions is not None and cell_region[i] not in regions:
+            continue
+        if products is not None and cell_product[i] not in products:
+            continue
+
+        key = tuple(part(i) for part in parts)
+        totals = groups.get(key)
+        if totals is None:
+            totals = groups[key] = [0, 0, 0]
+        totals[0] += quantity[i]
+        totals[1] += revenue[i]
+        totals[2] += count[i]
+
+    rows = []
+    for key in sorted(groups):
+        row = dict(zip(group_by, key))
+        row['quantity'] = groups[key][0]
+        row['revenue'] = to_rupees(groups[key][1])
+        row['transactions'] = groups[key][2]
+        rows.append(row)
+
+    return rows
+
+
+def cube_top_products(cube, n=5, region=None, start_date=None, end_date=None, by='quantity'):
+    """
+    Finds the top n products of a slice of the cube
+
+    Example: cube_top_products(cube, 5, 'North', '2024-12-23', '2024-12-29')
+
+    Parameters:
+        by (str): 'quantity' or 'revenue'
+
+    Returns: list of dictionaries (ProductID, ProductName, quantity,
+             revenue, transactions), best first
+    """
+
+    if by not in ('quantity', 'revenue'):
+        raise ValueError(f"by must be 'quantity' or 'revenue', got {by!r}")
+
+    rows = cube_query(cube, ('ProductID',), region=region,
+                      start_date=start_date, end_date=end_date)
+
+    for row in rows:
+        row['ProductName'] = cube['product_names'][row['ProductID']]
+
+    rows.sort(key=lambda row: row[by], reverse=True)
+
+    return rows[:n]
+
+
+# ---------------- PERSISTENCE ----------------
+
+def save_cube(cube, filename):
+    """
+    Writes the cube to a compact binary file (atomically)
+
+    Layout: a magic line, the length-prefixed JSON header with the
+    dimension values, then the raw bytes of every cell column.
+    """
+
+    header = json.dumps({
+        'byteorder': sys.byteorder,
+        'cells': len(cube['count']),
+        'regions': cube['regions'],
+        'products': cube['products'],
+        'dates': cube['dates'],
+        'product_names': cube['product_names'],
+        'columns': [[name, typecode, cube[name].itemsize] for name, typecode in _COLUMNS]
+    }).encode('utf-8')
+
+    directory = os.path.dirname(filename) or "."
+    os.makedirs(directory, exist_ok=True)
+    temp_file = f"{filename}.{os.getpid()}.tmp"
+
+    with open(temp_file, 'wb') as file:
+        file.write(_FILE_MAGIC)
+        file.write(len(header).to_bytes(8, 'little'))
+        file.write(header)
+        for name, _ in _COLUMNS:
+            cube[name].tofile(file)
+
+    os.replace(temp_file, filename)
+
+
+def load_cube(filename):
+    """
+    Reads a cube written by save_cube
+
+    Raises:
+        ValueError: If the file is not a cube file or was written with
+                    different array item sizes
+    """
+
+    with open(filename, 'rb') as file:
+        if file.read(len(_FILE_MAGIC)) != _FILE_MAGIC:
+            raise ValueError(f"{filename} is not a sales cube file")
+
+        header = json.loads(file.read(int.from_bytes(file.read(8), 'little')))
+
+        cube = {
+            'regions': header['regions'],
+            'products': header['products'],
+            'dates': header['dates'],
+            'product_names': header['product_names']
+        }
+
+        for name, typecode, itemsize in header['columns']:
+            column = array(typecode)
+            if column.itemsize != itemsize:
+                raise ValueError(f"{filename}: column {name} has {itemsize}-byte items, "
+                                 f"this platform uses {column.itemsize}")
+
+            column.fromfile(file, header['cells'])
+            if header['byteorder'] != sys.byteorder:
+                column.byteswap()
+            cube[name] = column
+
+    return cube
@@ -0,0 +1,180 @@
+#----------Compact Transaction Record----------
+
+import sys
+from collections.abc import Mapping
+
+from utils.money import to_paise
+
+# Column order of the pipe-delimited sales file
+TRANSACTION_FIELDS = [
+    'TransactionID', 'Date', 'ProductID', 'ProductName',
+    'Quantity', 'UnitPrice', 'CustomerID', 'Region'
+]
+
+_FIELD_NAMES = frozenset(TRANSACTION_FIELDS)
+
+
+class Transaction(Mapping):
+    """
+    Memory-efficient record for one parsed sales transaction.
+
+    Fields are stored in __slots__ instead of a per-row dict, and the
+    repeating text fields (Date, ProductID, ProductName, CustomerID, Region)
+    are interned so that all rows share one string object per value.
+
+    The record behaves like the dictionaries parse_transactions used to
+    return: tx['Region'], tx.get('Region'), 'Region' in tx, tx.items() and
+    tx.copy() (which returns a plain dict) all work as before.
+
+    The exact unit price in integer paise is kept in the extra attribute
+    `price_paise` (not one of the mapping keys); UnitPrice holds the same
+    value in rupees.
+    """
+
+    __slots__ = TRANSACTION_FIELDS + ['price_paise']
+
+    def __init__(self, transaction_id, date, product_id, product_name,
+                 quantity, unit_price, customer_id, region, price_paise=None):
+        intern = sys.intern
+
+        if price_paise is None:
+            price_paise = to_paise(unit_price)
+
+        self.TransactionID = transaction_id
+        self.Date = intern(date)
+        self.ProductID = intern(product_id)
+        self.ProductName = intern(product_name)
+        self.Quantity = quantity
+        self.UnitPrice = unit_price
+        self.CustomerID = intern(customer_id)
+        self.Region = intern(region)
+        self.price_paise = price_paise
+
+    def __getitem__(self, key):
+        if key in _FIELD_NAMES:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        # Only the fixed columns can be assigned; there is no room for extras
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+        # Keep the exact price in step with UnitPrice
+        if key == 'UnitPrice':
+            self.price_paise = to_paise(value)
+
+    def __iter__(self):
+        return iter(TRANSACTION_FIELDS)
+
+    def __len__(self):
+        return len(TRANSACTION_FIELDS)
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def __reduce__(self):
+        # Rebuild through __init__ so strings are interned again after
+        # crossing a process boundary
+        return (Transaction, tuple(getattr(self, name) for name in self.__slots__))
+
+    def copy(self):
+        """
+        Returns the record as a new, freely extendable dictionary
+        """
+        return {name: getattr(self, name) for name in TRANSACTION_FIELDS}
+
+
+# Text columns of a LazyTransaction, decoded on first access
+_TEXT_FIELDS = frozenset(
+    name for name in TRANSACTION_FIELDS if name not in ('Quantity', 'UnitPrice')
+)
+_FIELD_INDEX = {name: index for index, name in enumerate(TRANSACTION_FIELDS)}
+
+
+class LazyTransaction(Transaction):
+    """
+    Transaction parsed straight from a raw (bytes) line of the sales file.
+
+    Quantity and UnitPrice are parsed up front (a row whose numbers do not
+    convert is skipped by the reader), but the text columns stay as bytes
+    in the line until one of them is first read; only that column is then
+    cut out of the line, decoded, interned and stored in its slot. Code that
+    only touches a few columns (e.g. CustomerID and Date) never pays for
+    decoding the others.
+
+    The line is released once every text column has been decoded, leaving
+    a record the size of a Transaction. Until then it costs the line on top
+    of that (about 40 bytes more per row than an eager Transaction on the
+    generated test files): lazy records save CPU, not memory.
+
+    Apart from that the record behaves exactly like a Transaction.
+    """
+
+    __slots__ = ('_raw', '_pending')
+
+    def __init__(self, line, quantity, unit_price, price_paise):
+        # The raw line (bytes) and the number of text columns not yet decoded
+        self._raw = line
+        self._pending = len(_TEXT_FIELDS)
+        self.Quantity = quantity
+        self.UnitPrice = unit_price
+        self.price_paise = price_paise
+
+    def __getattr__(self, name):
+        # Only called for slots that have not been assigned yet
+        if name not in _TEXT_FIELDS:
+            raise AttributeError(name)
+
+        index = _FIELD_INDEX[name]
+        raw = self._raw.split(b'|', index + 1)[index].strip()
+        try:
+            value = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            value = raw.decode('latin-1')
+
+        # Same cleaning and interning as parse_transactions and Transaction
+        if name == 'ProductName':
+            value = value.replace(',', ' ')
+        if name != 'TransactionID':
+            value = sys.intern(value)
+
+        setattr(self, name, value)
+
+        self._pending -= 1
+        if not self._pending:
+            self._raw = None
+
+        return value
+
+    def __setitem__(self, key, value):
+        # Decode the column first, so the line is still released once every
+        # text column is set
+        if key in _TEXT_FIELDS:
+            getattr(self, key)
+        Transaction.__setitem__(self, key, value)
+
+    def __contains__(self, key):
+        # Checking for a column must not decode it
+        return key in _FIELD_NAMES
+
+    def _decoded(self):
+        """
+        Returns True if any text column has been read or assigned
+        """
+        for name in _TEXT_FIELDS:
+            try:
+                object.__getattribute__(self, name)
+                return True
+            except AttributeError:
+                pass
+        return False
+
+    def __reduce__(self):
+        # Untouched records cross process boundaries as raw bytes; others
+        # as a plain Transaction, so assigned values are never lost
+        if not self._decoded():
+            return (LazyTransaction, (self._raw, self.Quantity, self.UnitPrice, self.price_paise))
+
+        return (Transaction, tuple(getattr(self, name) for name in Transaction.__slots__))
@@ -0,0 +1,278 @@
+#----------Watch Mode: Live Report Updates----------
+
+import glob
+import os
+import select
+import sys
+import time
+
+from utils.file_handler import parse_transactions, is_valid_transaction
+from utils.anomaly import close_days
+from utils.incremental import new_aggregates, add_transaction, analytics_from_aggregates
+from utils.report_generator import write_sales_report
+
+# inotify constants (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# A report is written at the latest this many debounce intervals after the
+# first unreported change, even if data keeps arriving
+MAX_DELAY_INTERVALS = 10
+
+
+def _open_inotify(directory):
+    """
+    Starts an inotify watch on a directory
+
+    Returns: inotify file descriptor, or None if inotify is unavailable
+             (non-Linux systems); the caller then falls back to polling
+    """
+
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+
+        return fd
+
+    except (OSError, AttributeError):
+        return None
+
+
+def _wait_for_changes(inotify_fd, timeout):
+    """
+    Sleeps until the directory changes or the timeout expires
+    """
+
+    if inotify_fd is None:
+        time.sleep(timeout)
+        return
+
+    ready, _, _ = select.select([inotify_fd], [], [], timeout)
+    if not ready:
+        return
+
+    # The events themselves are not needed: the next scan compares file
+    # sizes, so the queue is simply drained
+    try:
+        while os.read(inotify_fd, 65536):
+            pass
+    except BlockingIOError:
+        pass
+
+
+def _decode_line(raw):
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def _new_state():
+    return {
+        'files': {},
+        'aggregates': new_aggregates(),
+        'enrichment': {
+            'enriched_count': 0,
+            'total': 0,
+            # Insertion-ordered (dict keys), so the report lists the
+            # products in the order they first failed
+            'failed_products': {}
+        },
+        'invalid_count': 0
+    }
+
+
+def _read_new_lines(path, file_state):
+    """
+    Reads the complete lines appended to a file since the last read
+
+    A trailing line without a newline is kept back until its newline is
+    written, so a row that is still being written is never parsed.
+
+    Returns: list of decoded lines, or None if the file was truncated or
+             replaced and everything has to be re-read
+    """
+
+    with open(path, 'rb') as file:
+        stat = os.fstat(file.fileno())
+
+        if file_state['inode'] not in (None, stat.st_ino) or stat.st_size < file_state['offset']:
+            return None
+
+        offset = file_state['offset']
+        file_state['inode'] = stat.st_ino
+
+        file.seek(offset)
+        data = file.read()
+
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return []
+
+    file_state['offset'] = offset + end
+    lines = data[:end].split(b'\n')
+
+    # Skip the header line at the start of every file
+    if offset == 0 and lines:
+        lines = lines[1:]
+
+    return [_decode_line(line) for line in lines]
+
+
+def _scan(state, data_dir, pattern, product_mapping):
+    """
+    Picks up new data from every matching file
+
+    Returns: True if any transactions were added
+    """
+
+    from utils.api_handler import enrich_sales_data
+
+    paths = sorted(glob.glob(os.path.join(data_dir, pattern)))
+
+    # A removed file means its rows must be dropped: start over
+    if any(path not in paths for path in state['files']):
+        state.clear()
+        state.update(_new_state())
+
+    new_lines = []
+    for path in paths:
+        file_state = state['files'].setdefault(
+            path, {'inode': None, 'offset': 0}
+        )
+
+        try:
+            lines = _read_new_lines(path, file_state)
+        except FileNotFoundError:
+            continue
+
+        if lines is None:
+            # Truncated or replaced: rebuild all aggregates from scratch
+            state.clear()
+            state.update(_new_state())
+            return _scan(state, data_dir, pattern, product_mapping)
+
+        new_lines.extend(lines)
+
+    if not new_lines:
+        return False
+
+    # Parse, validate and fold only the new rows into the running totals
+    valid = []
+    for tx in parse_transactions(new_lines):
+        if is_valid_transaction(tx):
+            add_transaction(state['aggregates'], tx)
+            valid.append(tx)
+        else:
+            state['invalid_count'] += 1
+
+    enrichment = state['enrichment']
+    for tx in enrich_sales_data(valid, product_mapping):
+        enrichment['total'] += 1
+        if tx['API_Match']:
+            enrichment['enriched_count'] += 1
+        else:
+            enrichment['failed_products'][tx['ProductName']] = None
+
+    return True
+
+
+def _close_finished_days(aggregates):
+    """
+    Scores every day before the newest one seen and prints an alert for
+    each anomaly found; the newest day stays open for late rows
+    """
+
+    for anomaly in close_days(aggregates['anomalies'], aggregates['end_date']):
+        print(f"ALERT {anomaly['date']}: {anomaly['dimension']} {anomaly['name']} "
+              f"revenue {anomaly['type']} (₹{anomaly['revenue']:,.2f}, "
+              f"expected ₹{anomaly['expected']:,.2f})")
+
+
+def watch_sales_feed(data_dir='data', pattern='sales*.txt',
+                     output_file='output/sales_report.txt',
+                     debounce=5.0, poll_interval=1.0,
+                     offline=False, stop_event=None):
+    """
+    Keeps the sales report up to date while sales files grow
+
+    Watches data_dir for new or appended files matching `pattern` (inotify
+    on Linux, polling elsewhere), parses only the new rows, updates running
+    totals and rewrites output_file atomically once no new data has arrived
+    for `debounce` seconds. Days before the newest date in the feed are then
+    checked for revenue anomalies, and an alert is printed for each one.
+
+    Parameters:
+        data_dir (str): Directory with the sales feed files
+        pattern (str): Glob pattern of the files to follow
+        output_file (str): Report path
+        debounce (float): Quiet period before the report is rewritten
+        poll_interval (float): Maximum time between file checks
+        offline (bool): Skip the product API and enrich from the saved
+                        product catalog
+        stop_event (threading.Event): Optional event that stops the loop
+    """
+
+    from utils.api_handler import create_product_mapping
+
+    if offline:
+        from utils.product_client import load_fallback_catalog
+        product_mapping = create_product_mapping(load_fallback_catalog())
+    else:
+        from utils.api_handler import fetch_all_products
+        product_mapping = create_product_mapping(fetch_all_products())
+
+    inotify_fd = _open_inotify(data_dir)
+    mode = "inotify" if inotify_fd is not None else f"polling every {poll_interval}s"
+    print(f"Watching {os.path.join(data_dir, pattern)} ({mode}). Press Ctrl+C to stop.")
+
+    state = _new_state()
+    first_change = None
+    last_change = None
+
+    try:
+        while stop_event is None or not stop_event.is_set():
+            now = time.monotonic()
+
+            if _scan(state, data_dir, pattern, product_mapping):
+                last_change = now
+                if first_change is None:
+                    first_change = now
+
+            # Rewrite the report once the feed has been quiet for a while
+            if first_change is not None and (
+                now - last_change >= debounce
+                or now - first_change >= debounce * MAX_DELAY_INTERVALS
+            ):
+                if state['aggregates']['transaction_count']:
+                    _close_finished_days(state['aggregates'])
+                    analytics = analytics_from_aggregates(state['aggregates'], open_days=False)
+                    write_sales_report(analytics, state['enrichment'], output_file)
+                first_change = None
+
+            _wait_for_changes(inotify_fd, min(poll_interval, debounce))
+
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+    finally:
+        if inotify_fd is not None:
+            os.close(inotify_fd)